@@ -0,0 +1,497 @@
+"""TrustGraph benchmark suite — offline, machine-readable, comparable between commits.
+
+Four parts:
+
+- ``micro``: the confidence-algebra hot paths (scalar_to_opinion,
+  apply_trust_discount, fuse_evidence, detect_conflicts) and
+  parse_evidence_json at growing input sizes, plus a check that the
+  bridge/opinion.py kernel matches jsonld-ex exactly (when installed).
+- ``e2e``: full TrustGraphAgent runs replayed from a record/replay
+  cassette (tools/replay.py), timed per stage (plan/search/extract/
+  score/report). No Gemini or Tavily keys are needed.
+- ``startup``: cold import time of the scoring, batch and worker entry
+  points, measured in fresh interpreters with ``python -X importtime``,
+  and which heavy dependencies each one pulled in.
+- ``http``: tools/http_client.py against a local stub HTTP server —
+  keep-alive reuse versus a new connection per call, a 503 that is
+  retried until it succeeds, and a 503 that exhausts the retries.
+  Exits non-zero if any of these checks fails.
+
+    python -m bench.benchmarks                          # micro + startup + http + e2e (if a cassette exists)
+    python -m bench.benchmarks --only startup           # cold import times only
+    python -m bench.benchmarks --only http              # HTTP client checks against a stub server
+    python -m bench.benchmarks --record                 # capture the e2e cassette (live keys)
+    python -m bench.benchmarks --out new.json --compare bench_results.json
+
+Results go to a JSON file with the commit, Python and platform they were
+measured on. ``--compare`` prints the ratio against an earlier results
+file and exits non-zero when anything slowed down by more than
+``--threshold``.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from typing import Any, Callable
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_CASSETTE = os.path.join(PROJECT_ROOT, "bench", "cassette.json")
+DEFAULT_QUESTIONS = os.path.join(PROJECT_ROOT, "examples", "questions.jsonl")
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+STAGES = ["plan", "search", "extract", "score", "report"]
+# Entry points timed by the startup suite ("trustgraph" is the Jac agent itself)
+STARTUP_MODULES = ["bridge.confidence", "bridge.batch", "tools.batch_verify", "tools.worker", "trustgraph"]
+# Dependencies that should stay unloaded until a run actually needs them
+HEAVY_MODULES = ["litellm", "byllm", "openai", "jsonld_ex", "numpy", "scipy"]
+
+
+# ── Environment ──
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit or None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+# ── Microbenchmarks ──
+
+def _evidence_raw(rng: random.Random, i: int) -> str:
+    """LLM-shaped evidence output: plain, fenced, or wrapped in prose."""
+    body = json.dumps({
+        "evidence": f"Study {i} reports an effect of {rng.random():.3f}.",
+        "supports": rng.random() < 0.7,
+        "relevance": round(rng.random(), 3),
+        "confidence": round(rng.random(), 3),
+    })
+    style = i % 3
+    if style == 0:
+        return body
+    if style == 1:
+        return f"```json\n{body}\n```"
+    return f"Here is the evidence you asked for:\n{body}\nLet me know if you need more."
+
+
+def _time(func: Callable[[], Any], repeat: int) -> dict:
+    """Best and median seconds per call of ``func`` over ``repeat`` autoranged runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best_s": min(runs), "median_s": statistics.median(runs), "number": number}
+
+
+def micro_benchmarks(sizes: list[int], repeat: int = 5) -> list[dict]:
+    from bridge.confidence import (
+        scalar_to_opinion, apply_trust_discount, fuse_evidence, detect_conflicts,
+    )
+
+    rng = random.Random(42)
+    biggest = max(sizes)
+    confidences = [rng.uniform(0.05, 0.95) for _ in range(biggest)]
+    trusts = [rng.uniform(0.3, 0.95) for _ in range(biggest)]
+    opinions = [scalar_to_opinion(c) for c in confidences]
+
+    cases: dict[str, tuple[Callable[[int], Callable[[], Any]], int]] = {
+        "scalar_to_opinion": (
+            lambda n: lambda: [scalar_to_opinion(c) for c in confidences[:n]], biggest),
+        "apply_trust_discount": (
+            lambda n: lambda: [apply_trust_discount(o, t) for o, t in zip(opinions[:n], trusts[:n])],
+            biggest),
+        "fuse_evidence": (lambda n: lambda: fuse_evidence(opinions[:n]), biggest),
+        # O(n^2) pairwise; capped so the suite stays a few seconds
+        "detect_conflicts": (lambda n: lambda: detect_conflicts(opinions[:n]), 1000),
+    }
+
+    try:
+        parse = _load_parse_evidence_json()
+        raws = [_evidence_raw(rng, i) for i in range(biggest)]
+        cases["parse_evidence_json"] = (lambda n: lambda: [parse(r) for r in raws[:n]], biggest)
+        skipped = None
+    except Exception as e:
+        skipped = f"{type(e).__name__}: {e}"
+
+    results = []
+    for name, (make, max_n) in cases.items():
+        for n in sizes:
+            if n > max_n:
+                continue
+            timing = _time(make(n), repeat)
+            results.append({
+                "name": name,
+                "n": n,
+                **timing,
+                "per_item_us": timing["best_s"] / n * 1e6,
+            })
+            print(f"  {name:<22} n={n:<6} best {timing['best_s'] * 1000:10.3f} ms"
+                  f"  ({results[-1]['per_item_us']:.2f} µs/item)")
+    if skipped:
+        print(f"  parse_evidence_json    skipped ({skipped})")
+        results.append({"name": "parse_evidence_json", "skipped": skipped})
+    return results
+
+
+def kernel_parity(cases: int = 2000, seed: int = 7) -> dict:
+    """Largest difference between bridge/opinion.py and jsonld-ex over random opinions."""
+    try:
+        import jsonld_ex.confidence_algebra as reference
+    except ImportError as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    import bridge.opinion as kernel
+
+    rng = random.Random(seed)
+    worst = 0.0
+
+    def pair() -> tuple:
+        u = 0.0 if rng.random() < 0.1 else rng.random()  # include dogmatic opinions
+        c, a = rng.random(), rng.random()
+        args = ((1 - u) * c, (1 - u) * (1 - c), u, a)
+        return kernel.Opinion(*args), reference.Opinion(*args)
+
+    def diff(x, y) -> float:
+        if isinstance(x, float):
+            return abs(x - y)
+        return max(abs(x.belief - y.belief), abs(x.disbelief - y.disbelief),
+                   abs(x.uncertainty - y.uncertainty), abs(x.base_rate - y.base_rate))
+
+    for _ in range(cases):
+        ks, rs = zip(*(pair() for _ in range(rng.randint(1, 6))))
+        for name, args in (("cumulative_fuse", None), ("averaging_fuse", None),
+                           ("trust_discount", 2), ("pairwise_conflict", 2), ("conflict_metric", 1)):
+            k_args, r_args = (ks, rs) if args is None else ((ks[0], ks[-1])[:args], (rs[0], rs[-1])[:args])
+            worst = max(worst, diff(getattr(kernel, name)(*k_args), getattr(reference, name)(*r_args)))
+    print(f"  opinion kernel vs jsonld-ex: {cases} cases, max difference {worst:.3g}")
+    return {"cases": cases, "max_abs_diff": worst}
+
+
+# ── HTTP client ──
+
+def _stub_server():
+    """Local keep-alive JSON server. Paths: /ok, /flaky/<n> (503 for the first n
+    requests on that path), /down (always 503). Returns (server, stats)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stats: dict[str, Any] = {"requests": {}, "connections": set()}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                stats["connections"].add(self.client_address)
+                seen = stats["requests"][self.path] = stats["requests"].get(self.path, 0) + 1
+            fail = self.path == "/down" or (
+                self.path.startswith("/flaky/") and seen <= int(self.path.rsplit("/", 1)[1]))
+            body = b"" if fail else json.dumps({"path": self.path, "n": seen}).encode("utf-8")
+            self.send_response(503 if fail else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, name="http-stub", daemon=True).start()
+    return server, stats
+
+
+def http_client_check(calls: int = 200) -> dict:
+    """Connection reuse and 503 retries of tools/http_client.py against a stub server."""
+    from tools.http_client import HTTPClient, HTTPClientError
+
+    server, stats = _stub_server()
+    base = f"http://127.0.0.1:{server.server_port}"
+    failures = []
+    try:
+        client = HTTPClient(max_retries=3, backoff_base=0.001, timeout=5, deadline=10)
+        started = time.perf_counter()
+        for _ in range(calls):
+            client.post_json(base + "/ok", {})
+        pooled_ms = (time.perf_counter() - started) * 1000 / calls
+        pooled_connections = len(stats["connections"])
+        if pooled_connections != 1:
+            failures.append(f"{calls} sequential calls opened {pooled_connections} connections")
+
+        stats["connections"].clear()
+        started = time.perf_counter()
+        for _ in range(calls):
+            client.post_json(base + "/ok", {}, headers={"Connection": "close"})
+        fresh_ms = (time.perf_counter() - started) * 1000 / calls
+        client.close()
+
+        result = client.post_json(base + "/flaky/2", {})
+        if result.get("n") != 3:
+            failures.append(f"503 x2 then 200: expected success on attempt 3, got {result}")
+
+        try:
+            client.post_json(base + "/down", {})
+            failures.append("always-503 endpoint did not raise HTTPClientError")
+        except HTTPClientError as e:
+            if e.status != 503 or e.attempts != client.max_retries + 1:
+                failures.append(f"always-503: status={e.status} attempts={e.attempts}")
+        if stats["requests"].get("/down") != client.max_retries + 1:
+            failures.append(f"always-503: server saw {stats['requests'].get('/down')} requests")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"  http client: keep-alive {pooled_ms:.2f} ms/call on {pooled_connections} connection, "
+          f"new connection per call {fresh_ms:.2f} ms/call; retries "
+          f"{'ok' if not failures else 'FAILED: ' + '; '.join(failures)}")
+    return {"calls": calls, "pooled_ms": round(pooled_ms, 3), "fresh_ms": round(fresh_ms, 3),
+            "pooled_connections": pooled_connections, "failures": failures}
+
+
+def _load_parse_evidence_json() -> Callable[[str], dict]:
+    """parse_evidence_json lives in trustgraph.jac, so this needs jaclang."""
+    import jaclang  # noqa: F401  (registers the .jac importer)
+    import trustgraph
+    return trustgraph.parse_evidence_json
+
+
+# ── End-to-end ──
+
+def _stage_timings(events_path: str) -> dict:
+    """Per-stage and total milliseconds from one run's event stream."""
+    timings: dict[str, float] = {}
+    with open(events_path, "r", encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if event.get("event") == "stage_end" and event.get("elapsed_ms") is not None:
+                timings[event["stage"]] = event["elapsed_ms"]
+            elif event.get("event") == "run_end":
+                timings["total"] = event["elapsed_ms"]
+    return timings
+
+
+def e2e_benchmarks(questions_path: str, cassette_path: str, record: bool = False,
+                   repeat: int = 3, options: dict | None = None) -> dict:
+    """Run TrustGraphAgent on each question through the cassette, timing every stage."""
+    from tools.batch_verify import read_questions
+    from tools.replay import use_cassette
+    from tools.worker import load_agent
+
+    cassette = use_cassette(cassette_path, "record" if record else "replay")
+    agent, startup_ms = load_agent()
+    repeat = 1 if record else repeat
+
+    per_question = []
+    for q in read_questions(questions_path):
+        run_options = {**(options or {}), "output_path": ""}
+        if q.get("num_claims") is not None:
+            run_options["num_claims"] = int(q["num_claims"])
+        runs = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                events_path = os.path.join(tmp, "events.ndjson")
+                os.environ["TRUSTGRAPH_EVENTS"] = events_path
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        agent.run_verification(q["question"], run_options)
+                finally:
+                    os.environ.pop("TRUSTGRAPH_EVENTS", None)
+                runs.append(_stage_timings(events_path))
+        median = {k: statistics.median(r.get(k, 0.0) for r in runs) for k in STAGES + ["total"]}
+        per_question.append({"id": q["id"], "runs": runs, "median_ms": median})
+        print(f"  {q['id']:<22} total {median['total']:9.1f} ms  "
+              + "  ".join(f"{s} {median[s]:.1f}" for s in STAGES))
+
+    stages_ms = {k: round(sum(q["median_ms"][k] for q in per_question), 1) for k in STAGES + ["total"]}
+    return {
+        "cassette": cassette_path,
+        "mode": cassette.mode,
+        "repeat": repeat,
+        "startup_ms": round(startup_ms, 1),
+        "questions": per_question,
+        "stages_ms": stages_ms,
+        "cassette_stats": cassette.stats(),
+    }
+
+
+# ── Startup ──
+
+_IMPORT_MARK = "--- trustgraph import ---"
+
+
+def _import_time(module: str) -> dict:
+    """One cold import of ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Only imports after the marker line count, so interpreter startup and
+    ``site`` are left out. Returns the import's milliseconds, the whole
+    process's wall-clock milliseconds, the module's slowest direct
+    dependencies and the heavy dependencies left loaded.
+    """
+    setup = "import jaclang; " if module == "trustgraph" else ""
+    code = (f"import sys; {setup}print({_IMPORT_MARK!r}, file=sys.stderr, flush=True); import {module}; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get("PYTHONPATH")]))}
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True, timeout=600)
+    process_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    lines = proc.stderr.splitlines()
+    top: list[tuple[str, float]] = []
+    children: list[tuple[str, float]] = []
+    for line in lines[lines.index(_IMPORT_MARK) + 1:]:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Names are indented two spaces per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            top.append((name.strip(), int(cumulative) / 1000))
+        elif depth == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+    return {
+        "import_ms": sum(ms for _, ms in top),
+        "process_ms": process_ms,
+        "slowest": sorted(children, key=lambda t: -t[1])[:5],
+        "heavy_loaded": proc.stdout.split(),
+    }
+
+
+def startup_benchmarks(modules: list[str], repeat: int = 5) -> list[dict]:
+    """Best-of-``repeat`` cold import time for each entry point."""
+    results = []
+    for module in modules:
+        try:
+            runs = [_import_time(module) for _ in range(repeat)]
+        except Exception as e:
+            print(f"  {module:<22} skipped ({type(e).__name__}: {e})")
+            results.append({"name": module, "skipped": f"{type(e).__name__}: {e}"})
+            continue
+        best = min(runs, key=lambda r: r["import_ms"])
+        results.append({
+            "name": module,
+            "import_ms": round(best["import_ms"], 2),
+            "median_import_ms": round(statistics.median(r["import_ms"] for r in runs), 2),
+            "process_ms": round(min(r["process_ms"] for r in runs), 1),
+            "slowest": [{"module": m, "ms": round(ms, 2)} for m, ms in best["slowest"]],
+            "heavy_loaded": best["heavy_loaded"],
+        })
+        print(f"  {module:<22} import {best['import_ms']:9.1f} ms  process {results[-1]['process_ms']:8.1f} ms"
+              f"  heavy: {', '.join(best['heavy_loaded']) or 'none'}")
+    return results
+
+
+# ── Comparison ──
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print current/baseline ratios and return the names of regressions."""
+    regressions = []
+    print(f"\nComparing against {baseline.get('environment', {}).get('commit') or 'baseline'}"
+          f" (regression threshold +{threshold:.0%})")
+
+    def check(label: str, new: float, old: float) -> None:
+        if not old:
+            return
+        ratio = new / old
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(label)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {label:<36} {ratio:6.2f}x{flag}")
+
+    old_micro = {(r["name"], r.get("n")): r for r in baseline.get("micro", []) if "best_s" in r}
+    for r in current.get("micro", []):
+        old = old_micro.get((r["name"], r.get("n")))
+        if old and "best_s" in r:
+            check(f"{r['name']}[n={r['n']}]", r["best_s"], old["best_s"])
+
+    old_startup = {r["name"]: r for r in baseline.get("startup") or [] if "import_ms" in r}
+    for r in current.get("startup") or []:
+        old = old_startup.get(r["name"])
+        if old and "import_ms" in r:
+            check(f"startup.{r['name']}", r["import_ms"], old["import_ms"])
+
+    old_e2e = (baseline.get("e2e") or {}).get("stages_ms", {})
+    for stage, ms in ((current.get("e2e") or {}).get("stages_ms") or {}).items():
+        check(f"e2e.{stage}", ms, old_e2e.get(stage, 0.0))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TrustGraph benchmark suite")
+    parser.add_argument("--out", default="bench_results.json", help="Results file to write")
+    parser.add_argument("--only", choices=["micro", "e2e", "startup", "http"], help="Run just one part")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per case")
+    parser.add_argument("--modules", nargs="+", default=STARTUP_MODULES,
+                        help="Entry points timed by the startup suite")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS)
+    parser.add_argument("--record", action="store_true",
+                        help="Record the e2e cassette from live Gemini/Tavily calls")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown ratio counted as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {"environment": environment()}
+    if args.only in (None, "micro"):
+        print("Microbenchmarks")
+        results["micro"] = micro_benchmarks(args.sizes, args.repeat)
+        results["kernel_parity"] = kernel_parity()
+    if args.only in (None, "startup"):
+        print("Startup (python -X importtime)")
+        results["startup"] = startup_benchmarks(args.modules, args.repeat)
+    if args.only in (None, "http"):
+        print("HTTP client (local stub server)")
+        results["http"] = http_client_check()
+    if args.only in (None, "e2e"):
+        if args.record or os.path.exists(args.cassette):
+            print(f"End-to-end ({'recording' if args.record else 'replaying'} {args.cassette})")
+            results["e2e"] = e2e_benchmarks(args.questions, args.cassette, args.record,
+                                            repeat=min(args.repeat, 3))
+        else:
+            print(f"End-to-end skipped: no cassette at {args.cassette} (run with --record first)")
+            results["e2e"] = None
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if results.get("http") and results["http"]["failures"]:
+        sys.exit(1)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,47 @@
-"""TrustGraph confidence bridge — jsonld-ex Subjective Logic integration."""
-
-import sys
-sys.path.insert(0, r"E:\data\code\claudecode\jsonld\jsonld-ex\packages\python\src")
-
-from jsonld_ex.confidence_algebra import (
-    Opinion,
-    cumulative_fuse,
-    trust_discount,
-    pairwise_conflict,
-    conflict_metric,
-)
-from jsonld_ex.confidence_bridge import combine_opinions_from_scalars
+"""TrustGraph confidence bridge — jsonld-ex Subjective Logic integration.
+
+The operators come from the jsonld-ex package when it is installed, and
+otherwise from ``bridge/opinion.py``, a dependency-free kernel that gives
+the same numbers and imports in well under a millisecond. Set
+``TRUSTGRAPH_OPINION_BACKEND`` to ``kernel`` or ``jsonld_ex`` to force one.
+"""
+
+import os
 from datetime import datetime, timezone
 from typing import Any
 
+from tools.telemetry import traced
+
+OPINION_BACKEND = os.environ.get("TRUSTGRAPH_OPINION_BACKEND", "auto")
+
+if OPINION_BACKEND != "kernel":
+    try:
+        from jsonld_ex.confidence_algebra import (
+            Opinion,
+            cumulative_fuse,
+            averaging_fuse,
+            trust_discount,
+            pairwise_conflict,
+            conflict_metric,
+        )
+        OPINION_BACKEND = "jsonld_ex"
+    except ImportError:
+        if OPINION_BACKEND == "jsonld_ex":
+            raise
+        OPINION_BACKEND = "kernel"
+
+if OPINION_BACKEND == "kernel":
+    from bridge.opinion import (
+        Opinion,
+        cumulative_fuse,
+        averaging_fuse,
+        trust_discount,
+        pairwise_conflict,
+        conflict_metric,
+    )
+
 
+@traced("fusion")
 def scalar_to_opinion(confidence: float, evidence_weight: float = 1.0) -> Opinion:
     """Convert a scalar confidence [0,1] into a Subjective Logic opinion.
 
@@ -41,6 +68,7 @@ def scalar_to_opinion(confidence: float, evidence_weight: float = 1.0) -> Opinio
     return Opinion(belief=b, disbelief=d, uncertainty=u, base_rate=0.5)
 
 
+@traced("fusion")
 def flip_opinion(op: Opinion) -> Opinion:
     """Flip an opinion: swap belief and disbelief.
 
@@ -57,14 +85,38 @@ def flip_opinion(op: Opinion) -> Opinion:
     )
 
 
-def fuse_evidence(opinions: list[Opinion]) -> Opinion:
+@traced("fusion")
+def collapse_duplicates(opinions: list[Opinion], groups: list) -> list[Opinion]:
+    """Merge opinions from duplicate sources into one opinion per group.
+
+    ``groups`` gives each opinion a source group key (see
+    tools/source_registry.py); opinions sharing a key come from the same
+    page or syndicated copies of it. They are dependent, so each group is
+    combined with averaging fusion, which does not reduce uncertainty the
+    way cumulative fusion of independent sources does. Groups keep the
+    order of their first opinion.
+    """
+    by_group: dict[Any, list[Opinion]] = {}
+    for op, group in zip(opinions, groups):
+        by_group.setdefault(group, []).append(op)
+    return [ops[0] if len(ops) == 1 else averaging_fuse(*ops) for ops in by_group.values()]
+
+
+@traced("fusion")
+def fuse_evidence(opinions: list[Opinion], groups: list | None = None) -> Opinion:
     """Fuse multiple opinions using cumulative fusion.
 
     Each opinion represents one piece of evidence. Cumulative fusion
     reduces uncertainty as more independent sources agree, and balances
     belief/disbelief when sources disagree. This is the correct way
     to combine evidence — NOT inflating source_count per piece.
+
+    Cumulative fusion assumes the sources are independent. Pass ``groups``
+    (one source group key per opinion) to collapse duplicate sources
+    with ``collapse_duplicates`` first.
     """
+    if groups is not None:
+        opinions = collapse_duplicates(opinions, groups)
     if not opinions:
         return Opinion(belief=0.0, disbelief=0.0, uncertainty=1.0, base_rate=0.5)
     if len(opinions) == 1:
@@ -76,6 +128,65 @@ def fuse_evidence(opinions: list[Opinion]) -> Opinion:
     return result
 
 
+class EvidenceAccumulator:
+    """Incrementally fuse evidence opinions as they arrive.
+
+    Each ``add`` folds one more opinion into the running cumulative fusion,
+    so after every piece of evidence the fused opinion is exactly what
+    ``fuse_evidence`` would return for the evidence seen so far. Supporting
+    and contradicting evidence are also fused separately so the running
+    within-claim conflict can be checked without re-fusing everything.
+
+    Opinions must already be oriented towards the claim, i.e. contradicting
+    evidence has been passed through ``flip_opinion``.
+    """
+
+    def __init__(self):
+        self.opinions: list[Opinion] = []
+        self.fused = fuse_evidence([])
+        self.fused_for: Opinion | None = None
+        self.fused_against: Opinion | None = None
+        self.num_supporting = 0
+        self.num_contradicting = 0
+
+    def add(self, opinion: Opinion, supports: bool = True) -> Opinion:
+        """Fold one evidence opinion in and return the updated fused opinion."""
+        self.fused = opinion if not self.opinions else cumulative_fuse(self.fused, opinion)
+        self.opinions.append(opinion)
+        if supports:
+            self.fused_for = opinion if self.fused_for is None else cumulative_fuse(self.fused_for, opinion)
+            self.num_supporting += 1
+        else:
+            self.fused_against = opinion if self.fused_against is None else cumulative_fuse(self.fused_against, opinion)
+            self.num_contradicting += 1
+        return self.fused
+
+    @property
+    def count(self) -> int:
+        return len(self.opinions)
+
+    @property
+    def uncertainty(self) -> float:
+        return float(self.fused.uncertainty)
+
+    @property
+    def conflict(self) -> float:
+        """Conflict between fused supporting and contradicting evidence (0 if one side is empty)."""
+        if self.fused_for is None or self.fused_against is None:
+            return 0.0
+        return float(pairwise_conflict(self.fused_for, self.fused_against))
+
+    def should_stop(self, target_uncertainty: float, conflict_threshold: float = 0.2,
+                    min_sources: int = 1) -> bool:
+        """True once enough evidence is in: uncertainty at or below target and no open conflict."""
+        return (
+            self.count >= min_sources
+            and self.uncertainty <= target_uncertainty
+            and self.conflict <= conflict_threshold
+        )
+
+
+@traced("fusion")
 def apply_trust_discount(opinion: Opinion, source_trust: float) -> Opinion:
     """Discount an opinion by the trustworthiness of its source.
 
@@ -95,6 +206,7 @@ def apply_trust_discount(opinion: Opinion, source_trust: float) -> Opinion:
     return trust_discount(trust_op, opinion)
 
 
+@traced("fusion")
 def detect_conflicts_within_claim(
     supporting_opinions: list[Opinion],
     contradicting_opinions: list[Opinion],
@@ -139,6 +251,7 @@ def detect_conflicts_within_claim(
     return None
 
 
+@traced("fusion")
 def detect_conflicts(opinions: list[Opinion], threshold: float = 0.3) -> list[dict]:
     """Detect pairwise conflicts among opinions.
 
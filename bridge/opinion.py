@@ -0,0 +1,254 @@
+"""TrustGraph opinion kernel — dependency-free Subjective Logic operators.
+
+The subset of ``jsonld_ex.confidence_algebra`` that the confidence bridge
+uses: ``Opinion`` plus cumulative and averaging fusion, trust discount,
+pairwise conflict and the conflict metric. Each operator uses the same
+formula, the same dogmatic-limit handling and the same order of float
+operations as jsonld-ex (Jøsang 2016), so results are bit-for-bit
+identical. ``bench/benchmarks.py`` checks this whenever jsonld-ex is
+installed.
+
+Importing this module takes well under a millisecond. Importing the
+jsonld_ex package loads all of its submodules first.
+"""
+
+import math
+
+# b + d + u = 1 tolerance, and the machine-epsilon overshoot clamped at [0, 1]
+_ADDITIVITY_TOL = 1e-9
+_BOUNDARY_TOL = 1e-12
+
+
+def _validate_component(value, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"{name} must be a number, got: {type(value).__name__}")
+    if math.isnan(value) or math.isinf(value):
+        raise ValueError(f"{name} must be finite, got: {value}")
+    fval = float(value)
+    if -_BOUNDARY_TOL <= fval < 0.0:
+        fval = 0.0
+    elif 1.0 < fval <= 1.0 + _BOUNDARY_TOL:
+        fval = 1.0
+    if fval < 0.0 or fval > 1.0:
+        raise ValueError(f"{name} must be in [0, 1], got: {value}")
+    return fval
+
+
+class Opinion:
+    """An immutable subjective opinion ω = (belief, disbelief, uncertainty, base_rate).
+
+    Components are validated to lie in [0, 1] and b + d + u must equal 1.
+    Equality and hashing are by value, as for jsonld-ex's frozen dataclass.
+    """
+
+    __slots__ = ("belief", "disbelief", "uncertainty", "base_rate")
+
+    def __init__(self, belief: float, disbelief: float, uncertainty: float, base_rate: float = 0.5):
+        b = _validate_component(belief, "belief")
+        d = _validate_component(disbelief, "disbelief")
+        u = _validate_component(uncertainty, "uncertainty")
+        a = _validate_component(base_rate, "base_rate")
+        total = b + d + u
+        if abs(total - 1.0) > _ADDITIVITY_TOL:
+            raise ValueError(
+                f"belief + disbelief + uncertainty must sum to 1, got {b} + {d} + {u} = {total}"
+            )
+        _set = object.__setattr__
+        _set(self, "belief", b)
+        _set(self, "disbelief", d)
+        _set(self, "uncertainty", u)
+        _set(self, "base_rate", a)
+
+    @classmethod
+    def _create_unchecked(cls, b: float, d: float, u: float, a: float = 0.5) -> "Opinion":
+        """Build an opinion from operator output that satisfies the invariants by construction."""
+        obj = object.__new__(cls)
+        _set = object.__setattr__
+        _set(obj, "belief", b)
+        _set(obj, "disbelief", d)
+        _set(obj, "uncertainty", u)
+        _set(obj, "base_rate", a)
+        return obj
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"cannot delete field '{name}'")
+
+    def _astuple(self) -> tuple[float, float, float, float]:
+        return (self.belief, self.disbelief, self.uncertainty, self.base_rate)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self):
+        return hash(self._astuple())
+
+    def __reduce__(self):
+        return (self.__class__._create_unchecked, self._astuple())
+
+    def __repr__(self) -> str:
+        return (
+            f"Opinion(b={self.belief:.4f}, d={self.disbelief:.4f}, "
+            f"u={self.uncertainty:.4f}, a={self.base_rate:.4f})"
+        )
+
+    def projected_probability(self) -> float:
+        """P(ω) = b + a·u."""
+        return self.belief + self.base_rate * self.uncertainty
+
+    def to_confidence(self) -> float:
+        return self.projected_probability()
+
+    @classmethod
+    def from_confidence(cls, confidence: float, uncertainty: float = 0.0,
+                        base_rate: float = 0.5) -> "Opinion":
+        """Split (1 - uncertainty) between belief and disbelief in proportion to ``confidence``."""
+        c = _validate_component(confidence, "@confidence")
+        u = _validate_component(uncertainty, "uncertainty")
+        _validate_component(base_rate, "base_rate")
+        remaining = 1.0 - u
+        return cls._create_unchecked(c * remaining, (1.0 - c) * remaining, u, base_rate)
+
+    @classmethod
+    def from_evidence(cls, positive: float, negative: float, prior_weight: float = 2.0,
+                      base_rate: float = 0.5) -> "Opinion":
+        """Opinion from evidence counts: b = r/(r+s+W), d = s/(r+s+W), u = W/(r+s+W)."""
+        if positive < 0 or negative < 0:
+            raise ValueError("Evidence counts must be non-negative")
+        if prior_weight <= 0:
+            raise ValueError("prior_weight must be positive")
+        r, s, w = float(positive), float(negative), float(prior_weight)
+        total = r + s + w
+        return cls._create_unchecked(r / total, s / total, w / total, base_rate)
+
+    def to_jsonld(self) -> dict:
+        return {
+            "@type": "Opinion",
+            "belief": self.belief,
+            "disbelief": self.disbelief,
+            "uncertainty": self.uncertainty,
+            "baseRate": self.base_rate,
+        }
+
+    @classmethod
+    def from_jsonld(cls, data: dict) -> "Opinion":
+        return cls(
+            belief=data["belief"],
+            disbelief=data["disbelief"],
+            uncertainty=data["uncertainty"],
+            base_rate=data.get("baseRate", 0.5),
+        )
+
+
+def _require_opinion(value, name: str) -> None:
+    if not isinstance(value, Opinion):
+        raise TypeError(f"{name} must be an Opinion, got: {type(value).__name__}")
+
+
+def cumulative_fuse(*opinions: Opinion) -> Opinion:
+    """Cumulative fusion (⊕) of independent opinions, folded left to right."""
+    if not opinions:
+        raise ValueError("cumulative_fuse requires at least one opinion")
+    result = opinions[0]
+    for op in opinions[1:]:
+        result = _cumulative_fuse_pair(result, op)
+    return result
+
+
+def _cumulative_fuse_pair(a: Opinion, b: Opinion) -> Opinion:
+    u_a, u_b = a.uncertainty, b.uncertainty
+    if u_a == 0.0 and u_b == 0.0:
+        # Dogmatic limit with equal relative dogmatism
+        fused_b = 0.5 * a.belief + 0.5 * b.belief
+        fused_d = 0.5 * a.disbelief + 0.5 * b.disbelief
+        fused_u = 0.0
+    else:
+        kappa = u_a + u_b - u_a * u_b
+        fused_b = (a.belief * u_b + b.belief * u_a) / kappa
+        fused_d = (a.disbelief * u_b + b.disbelief * u_a) / kappa
+        fused_u = (u_a * u_b) / kappa
+    return Opinion._create_unchecked(fused_b, fused_d, fused_u, (a.base_rate + b.base_rate) / 2.0)
+
+
+def averaging_fuse(*opinions: Opinion) -> Opinion:
+    """Averaging fusion (⊘) of dependent opinions, using the simultaneous n-ary form."""
+    if not opinions:
+        raise ValueError("averaging_fuse requires at least one opinion")
+    if len(opinions) == 1:
+        return opinions[0]
+    if len(opinions) == 2:
+        return _averaging_fuse_pair(opinions[0], opinions[1])
+    return _averaging_fuse_nary(opinions)
+
+
+def _averaging_fuse_pair(a: Opinion, b: Opinion) -> Opinion:
+    u_a, u_b = a.uncertainty, b.uncertainty
+    kappa = u_a + u_b
+    if kappa == 0.0:
+        fused_b = (a.belief + b.belief) / 2.0
+        fused_d = (a.disbelief + b.disbelief) / 2.0
+        fused_u = 0.0
+    else:
+        fused_b = (a.belief * u_b + b.belief * u_a) / kappa
+        fused_d = (a.disbelief * u_b + b.disbelief * u_a) / kappa
+        fused_u = 2.0 * u_a * u_b / kappa
+    return Opinion._create_unchecked(fused_b, fused_d, fused_u, (a.base_rate + b.base_rate) / 2.0)
+
+
+def _averaging_fuse_nary(opinions) -> Opinion:
+    n = len(opinions)
+    uncertainties = [o.uncertainty for o in opinions]
+    full_product = math.prod(uncertainties)
+
+    # U_i = product of every other uncertainty
+    capital_u = []
+    for i, u_i in enumerate(uncertainties):
+        if u_i != 0.0:
+            capital_u.append(full_product / u_i)
+        else:
+            product = 1.0
+            for j, u_j in enumerate(uncertainties):
+                if j != i:
+                    product *= u_j
+            capital_u.append(product)
+    kappa = sum(capital_u)
+
+    if kappa == 0.0:
+        # Two or more dogmatic opinions: their simple average is the limit
+        pool = [o for o in opinions if o.uncertainty == 0.0] or list(opinions)
+        fused_b = sum(o.belief for o in pool) / len(pool)
+        fused_d = sum(o.disbelief for o in pool) / len(pool)
+        fused_u = 0.0
+    else:
+        fused_b = sum(o.belief * u_i for o, u_i in zip(opinions, capital_u)) / kappa
+        fused_d = sum(o.disbelief * u_i for o, u_i in zip(opinions, capital_u)) / kappa
+        fused_u = n * full_product / kappa
+    return Opinion._create_unchecked(fused_b, fused_d, fused_u, sum(o.base_rate for o in opinions) / n)
+
+
+def trust_discount(trust: Opinion, opinion: Opinion) -> Opinion:
+    """Trust discount (⊗): ``opinion`` as seen through ``trust`` in its source."""
+    b_trust = trust.belief
+    return Opinion._create_unchecked(
+        b_trust * opinion.belief,
+        b_trust * opinion.disbelief,
+        trust.disbelief + trust.uncertainty + b_trust * opinion.uncertainty,
+        opinion.base_rate,
+    )
+
+
+def pairwise_conflict(op_a: Opinion, op_b: Opinion) -> float:
+    """con(A, B) = b_A · d_B + d_A · b_B."""
+    _require_opinion(op_a, "op_a")
+    _require_opinion(op_b, "op_b")
+    return op_a.belief * op_b.disbelief + op_a.disbelief * op_b.belief
+
+
+def conflict_metric(opinion: Opinion) -> float:
+    """Internal conflict of one opinion: 1 − |b − d| − u, floored at 0."""
+    _require_opinion(opinion, "opinion")
+    return max(0.0, 1.0 - abs(opinion.belief - opinion.disbelief) - opinion.uncertainty)
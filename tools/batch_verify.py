@@ -0,0 +1,270 @@
+"""TrustGraph batch verification — verify a JSONL file of questions on a process pool.
+
+    python -m tools.batch_verify questions.jsonl -o reports.jsonl --workers 4 --rate 30
+
+Each input line is a JSON object with a ``question`` and optionally an
+``id`` and ``num_claims``:
+
+    {"id": "q-001", "question": "Is coffee good for your health?", "num_claims": 3}
+
+Every pool process loads the agent once and verifies many questions, so
+compilation and imports are paid per worker, not per question. All
+workers share a single start-rate budget (``--rate`` questions per
+minute), and their LLM and search calls run in the ``batch`` priority
+class of the quota scheduler (tools/quota.py), behind interactive jobs.
+Reports are appended to the output JSONL as they finish, one line
+per question:
+
+    {"id": "q-001", "question": "...", "status": "ok", "elapsed_ms": 8123.4, "report": {...}}
+
+The output file is also the checkpoint. Re-running the same command skips
+every question that already has an ``ok`` line, so a crashed or
+interrupted run resumes where it stopped. Failed questions are retried.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from typing import Any, Iterator
+
+from tools import quota
+from tools.worker import load_agent
+
+
+# ── Input / checkpoint ──
+
+def question_id(record: dict) -> str:
+    """Stable ID for an input record: its ``id``, else a hash of question and options."""
+    if record.get("id") is not None:
+        return str(record["id"])
+    raw = json.dumps([record.get("question", ""), record.get("num_claims", 0)])
+    return "q-" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def read_questions(path: str) -> Iterator[dict]:
+    """Yield input records with an ``id``. Blank and malformed lines are reported and skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"[WARN] {path}:{lineno}: not valid JSON, skipped", file=sys.stderr)
+                continue
+            if isinstance(record, str):
+                record = {"question": record}
+            if not record.get("question"):
+                print(f"[WARN] {path}:{lineno}: no question, skipped", file=sys.stderr)
+                continue
+            record["id"] = question_id(record)
+            yield record
+
+
+def load_checkpoint(path: str) -> set[str]:
+    """IDs already verified successfully in an existing output file.
+
+    A partially written last line (from a crash mid-write) is truncated.
+    """
+    done: set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if result.get("status") == "ok":
+            done.add(str(result.get("id")))
+    return done
+
+
+# ── Shared rate budget ──
+
+class RateLimiter:
+    """Spaces question starts across all pool processes to ``per_minute``.
+
+    Holds the next free start time in shared memory; each caller claims a
+    slot and sleeps until it. ``per_minute <= 0`` disables the limit.
+    """
+
+    def __init__(self, per_minute: float, ctx=mp):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = ctx.Value("d", 0.0, lock=False)
+        self._lock = ctx.Lock()
+
+    def acquire(self) -> float:
+        """Wait for a start slot. Returns the seconds spent waiting."""
+        if self.interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# ── Pool workers ──
+
+_agent = None
+_limiter: RateLimiter | None = None
+_options: dict = {}
+_verbose = False
+
+
+def _init_worker(limiter: RateLimiter, options: dict, verbose: bool) -> None:
+    global _agent, _limiter, _options, _verbose
+    _agent, _ = load_agent()
+    _limiter, _options, _verbose = limiter, options, verbose
+
+
+def _verify(record: dict) -> dict:
+    """Verify one question in a pool process. Never raises."""
+    options = {**_options, "output_path": ""}
+    if record.get("num_claims") is not None:
+        options["num_claims"] = int(record["num_claims"])
+    result = {"id": record["id"], "question": record["question"]}
+
+    if _limiter is not None:
+        _limiter.acquire()
+    started = time.perf_counter()
+    try:
+        # Batch questions queue behind interactive jobs for the shared API quotas
+        with quota.priority("batch"):
+            if _verbose:
+                report = _agent.run_verification(record["question"], options)
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    report = _agent.run_verification(record["question"], options)
+        if not report:
+            raise RuntimeError("agent finished without a report")
+        result.update(status="ok", report=report)
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+# ── Driver ──
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def run_batch(input_path: str, output_path: str, workers: int = 4, rate: float = 0.0,
+              options: dict | None = None, verbose: bool = False) -> dict:
+    """Verify every pending question in ``input_path``, appending results to ``output_path``.
+
+    Returns run statistics: counts, throughput and latency percentiles.
+    """
+    done = load_checkpoint(output_path)
+    pending, seen = [], set(done)
+    for record in read_questions(input_path):
+        if record["id"] not in seen:
+            seen.add(record["id"])
+            pending.append(record)
+    skipped = len(seen) - len(pending)
+    print(f"{len(pending)} questions to verify ({skipped} already done), {workers} workers")
+
+    stats: dict[str, Any] = {"total": len(pending), "skipped": skipped, "ok": 0, "failed": 0}
+    latencies: list[float] = []
+    started = time.perf_counter()
+    if pending:
+        ctx = mp.get_context("spawn")
+        limiter = RateLimiter(rate, ctx)
+        with open(output_path, "a", encoding="utf-8") as out, ctx.Pool(
+            processes=max(1, min(workers, len(pending))),
+            initializer=_init_worker,
+            initargs=(limiter, options or {}, verbose),
+        ) as pool:
+            for n, result in enumerate(pool.imap_unordered(_verify, pending), 1):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if result["status"] == "ok":
+                    stats["ok"] += 1
+                    latencies.append(result["elapsed_ms"])
+                else:
+                    stats["failed"] += 1
+                print(f"[{n}/{len(pending)}] {result['status']:<5} "
+                      f"{result['elapsed_ms'] / 1000:6.1f}s  {result['id']}"
+                      + (f"  {result['error']}" if result["status"] != "ok" else ""),
+                      flush=True)
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["throughput_per_min"] = round(60 * (stats["ok"] + stats["failed"]) / elapsed, 2) if elapsed > 0 else 0.0
+    stats["latency_ms_p50"] = percentile(latencies, 0.50)
+    stats["latency_ms_p95"] = percentile(latencies, 0.95)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify a JSONL file of questions with TrustGraph")
+    parser.add_argument("input", help="JSONL file of {\"question\": ..., \"num_claims\": ...} lines")
+    parser.add_argument("-o", "--output", required=True,
+                        help="JSONL file to append reports to (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="Pool processes, each with its own warm agent")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Most questions started per minute across all workers (0 = unlimited)")
+    parser.add_argument("--claims", type=int, default=0,
+                        help="Default claims per question when a line has no num_claims")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Concurrent LLM/search calls within each question")
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--batch-extract", action="store_true")
+    parser.add_argument("--shared-extract", action="store_true")
+    parser.add_argument("--rerank", action="store_true")
+    parser.add_argument("--stream-plan", action="store_true",
+                        help="Start searching claims while the plan is still streaming")
+    parser.add_argument("--propagated-trust", action="store_true",
+                        help="Source trust from the stored run graph instead of domain ratings")
+    parser.add_argument("--reuse-claims", action="store_true",
+                        help="Reuse fresh near-duplicate claims from the claim index")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's own output")
+    args = parser.parse_args()
+
+    options = {
+        "num_claims": args.claims,
+        "max_in_flight": args.concurrency,
+        "adaptive_search": args.adaptive,
+        "batch_extract": args.batch_extract,
+        "reuse_claims": args.reuse_claims,
+        "shared_extract": args.shared_extract,
+        "rerank": args.rerank,
+        "propagated_trust": args.propagated_trust,
+        "stream_plan": args.stream_plan,
+    }
+    stats = run_batch(os.path.abspath(args.input), os.path.abspath(args.output),
+                      workers=args.workers, rate=args.rate, options=options,
+                      verbose=args.verbose)
+
+    print(f"\n{'='*60}")
+    print(f"  Verified {stats['ok']} / {stats['total']} questions "
+          f"({stats['failed']} failed, {stats['skipped']} skipped from checkpoint)")
+    print(f"  Elapsed: {stats['elapsed_s']:.1f}s  Throughput: {stats['throughput_per_min']:.1f}/min")
+    print(f"  Latency: p50 {stats['latency_ms_p50'] / 1000:.1f}s  p95 {stats['latency_ms_p95'] / 1000:.1f}s")
+    print(f"{'='*60}")
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
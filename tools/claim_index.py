@@ -0,0 +1,254 @@
+"""TrustGraph claim index — reuse verified claims across queries via near-duplicate matching.
+
+Every scored claim is stored with its fused opinion, sources, conflict
+and timestamp. A new claim is matched against earlier ones locally, with
+no embeddings service:
+
+1. Normalize the claim to its stemmed content words and their
+   unigram + bigram shingles (stopwords dropped).
+2. MinHash the shingles and look up candidates through LSH bands kept
+   in SQLite, so lookups touch only a few rows however large the index is.
+3. Score each candidate as the smaller of the shingle Jaccard
+   similarity and the word-pair order similarity. Claims whose polarity words
+   differ ("more" vs "less", "not", "increase" vs "reduce") score 0.
+   Bag-of-words matching alone would equate "A beats B" with "B beats A".
+
+A match at or above ``threshold`` that is younger than ``max_age`` can be
+reused instead of searching and extracting again. A stale match is
+re-verified, and the new result replaces the old entry in place.
+"""
+
+import difflib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Any
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Set TRUSTGRAPH_CLAIM_INDEX to an empty string to disable.
+CLAIM_INDEX_PATH = os.environ.get(
+    "TRUSTGRAPH_CLAIM_INDEX", os.path.join(PROJECT_ROOT, ".cache", "claims.sqlite3")
+)
+CLAIM_REUSE_THRESHOLD = float(os.environ.get("TRUSTGRAPH_CLAIM_REUSE_THRESHOLD", 0.65))
+CLAIM_REUSE_MAX_AGE = float(os.environ.get("TRUSTGRAPH_CLAIM_REUSE_MAX_AGE", 7 * 24 * 3600))
+
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: candidate probability ~50% at Jaccard 0.5, ~92% at 0.7
+_MERSENNE = (1 << 61) - 1
+# Fixed permutation coefficients, so signatures are stable across processes
+_PERMS = [
+    ((zlib.crc32(f"a{i}".encode()) << 29 | zlib.crc32(f"c{i}".encode())) % _MERSENNE | 1,
+     (zlib.crc32(f"b{i}".encode()) << 29 | zlib.crc32(f"d{i}".encode())) % _MERSENNE)
+    for i in range(NUM_PERM)
+]
+
+_STOPWORDS = frozenset("""
+a an and are as at be been being by can could did do does for from had has have how
+in into is it its of on or than that the their there these this those to
+was were what when which who will with would
+""".split())
+_POLARITY_WORDS = ("not", "no", "never", "without", "nor", "less", "least", "fewer", "more",
+                   "most", "higher", "lower", "greater", "better", "worse", "increase",
+                   "decrease", "reduce", "raise", "improve", "harm")
+_SUFFIXES = ("ingly", "ively", "ities", "ation", "ness", "ment", "ing", "ity", "ies",
+             "ive", "ed", "ly", "es", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+_POLARITY = frozenset(_stem(w) for w in _POLARITY_WORDS)
+
+
+def claim_words(text: str) -> list[str]:
+    """Stemmed content words of a claim, in order."""
+    return [_stem(w) for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _STOPWORDS]
+
+
+def claim_shingles(words: list[str]) -> set[str]:
+    """Unigram and bigram shingles of a claim's content words."""
+    shingles = set(words)
+    shingles.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return shingles
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def claim_similarity(a: list[str], b: list[str]) -> float:
+    """Near-duplicate score in [0, 1] for two claims' content words.
+
+    The smaller of shingle Jaccard and word-order similarity, and 0 when
+    the claims use different polarity words.
+    """
+    if _POLARITY.intersection(a) != _POLARITY.intersection(b):
+        return 0.0
+    # Compare the order of word pairs: swapping two entities breaks most bigrams
+    seq_a = list(zip(a, a[1:])) if len(a) > 1 else a
+    seq_b = list(zip(b, b[1:])) if len(b) > 1 else b
+    order = difflib.SequenceMatcher(None, seq_a, seq_b, autojunk=False).ratio()
+    return min(jaccard(claim_shingles(a), claim_shingles(b)), order)
+
+
+def minhash(shingles: set[str]) -> list[int]:
+    """NUM_PERM-value MinHash signature of a shingle set."""
+    if not shingles:
+        return [_MERSENNE] * NUM_PERM
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMS]
+
+
+def lsh_buckets(signature: list[int]) -> list[int]:
+    """One bucket id per band: a hash of that band's rows."""
+    rows = NUM_PERM // BANDS
+    return [
+        zlib.crc32(struct.pack(f"<{rows}Q", *signature[band * rows:(band + 1) * rows]))
+        for band in range(BANDS)
+    ]
+
+
+class ClaimIndex:
+    """Persistent store of verified claims with MinHash/LSH near-duplicate lookup."""
+
+    def __init__(self, path: str, threshold: float = CLAIM_REUSE_THRESHOLD,
+                 max_age: float = CLAIM_REUSE_MAX_AGE):
+        self.path = path
+        self.threshold = threshold
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS claims ("
+            " id INTEGER PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " words TEXT NOT NULL,"
+            " record TEXT NOT NULL,"
+            " verified_at REAL NOT NULL,"
+            " reuse_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS claim_lsh ("
+            " band INTEGER NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " claim_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS claim_lsh_bucket ON claim_lsh (band, bucket)")
+        self._conn.commit()
+
+    def match(self, text: str, count: bool = True) -> dict | None:
+        """Best earlier claim with claim_similarity >= threshold, fresh or stale.
+
+        Returns a dict with claim_id, text, similarity, age_s, fresh and
+        the stored record (opinion, sources, conflict), or None. With
+        ``count=False`` the lookup leaves hits, misses and reuse_count alone.
+        """
+        words = claim_words(text)
+        buckets = lsh_buckets(minhash(claim_shingles(words)))
+        now = time.time()
+        with self._lock:
+            where = " OR ".join("(band = ? AND bucket = ?)" for _ in buckets)
+            params = [v for band, bucket in enumerate(buckets) for v in (band, bucket)]
+            ids = [row[0] for row in self._conn.execute(
+                f"SELECT DISTINCT claim_id FROM claim_lsh WHERE {where}", params
+            )]
+            best = None
+            for claim_id in ids:
+                row = self._conn.execute(
+                    "SELECT text, words, record, verified_at FROM claims WHERE id = ?", (claim_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                similarity = claim_similarity(words, json.loads(row[1]))
+                if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                    best = {
+                        "claim_id": claim_id,
+                        "text": row[0],
+                        "similarity": round(similarity, 4),
+                        "age_s": round(now - row[3], 1),
+                        "fresh": now - row[3] <= self.max_age,
+                        "verified_at": row[3],
+                        "record": json.loads(row[2]),
+                    }
+            if count and best is not None and best["fresh"]:
+                self.hits += 1
+                self._conn.execute("UPDATE claims SET reuse_count = reuse_count + 1 WHERE id = ?",
+                                   (best["claim_id"],))
+                self._conn.commit()
+            elif count:
+                self.misses += 1
+        return best
+
+    def store(self, text: str, record: dict, replace_id: int | None = None) -> int:
+        """Store a verified claim's record; ``replace_id`` updates an earlier entry in place."""
+        words = claim_words(text)
+        buckets = lsh_buckets(minhash(claim_shingles(words)))
+        now = time.time()
+        with self._lock:
+            if replace_id is not None:
+                self._conn.execute("DELETE FROM claim_lsh WHERE claim_id = ?", (replace_id,))
+                cur = self._conn.execute(
+                    "UPDATE claims SET text = ?, words = ?, record = ?, verified_at = ? WHERE id = ?",
+                    (text, json.dumps(words), json.dumps(record), now, replace_id),
+                )
+                claim_id = replace_id if cur.rowcount else None
+            else:
+                claim_id = None
+            if claim_id is None:
+                cur = self._conn.execute(
+                    "INSERT INTO claims (text, words, record, verified_at) VALUES (?, ?, ?, ?)",
+                    (text, json.dumps(words), json.dumps(record), now),
+                )
+                claim_id = cur.lastrowid
+            self._conn.executemany(
+                "INSERT INTO claim_lsh (band, bucket, claim_id) VALUES (?, ?, ?)",
+                [(band, bucket, claim_id) for band, bucket in enumerate(buckets)],
+            )
+            self._conn.commit()
+        return claim_id
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_claim_index: ClaimIndex | None = None
+_claim_index_lock = threading.Lock()
+
+
+def get_claim_index() -> ClaimIndex | None:
+    """Return the shared claim index, opening it on first use (None if disabled)."""
+    global _claim_index
+    if _claim_index is None and CLAIM_INDEX_PATH:
+        with _claim_index_lock:
+            if _claim_index is None:
+                _claim_index = ClaimIndex(CLAIM_INDEX_PATH)
+    return _claim_index
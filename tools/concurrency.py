@@ -0,0 +1,120 @@
+"""TrustGraph concurrency helpers — bounded fan-out for LLM and search calls."""
+
+import contextlib
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from tools import telemetry
+
+
+class Cancelled(RuntimeError):
+    """Raised at a checkpoint once the run's cancel event is set."""
+
+
+_cancel_event: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar(
+    "trustgraph_cancel_event", default=None
+)
+
+
+@contextlib.contextmanager
+def cancel_on(event: threading.Event):
+    """Make ``check_cancelled`` inside the block raise once ``event`` is set."""
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def check_cancelled() -> None:
+    """Raise ``Cancelled`` if the surrounding run has been cancelled.
+
+    Called between stages and before every fan-out call, so a cancelled
+    run stops at the next wave instead of running to completion.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise Cancelled("run cancelled")
+
+
+def fan_out(func: Callable[..., Any], *iterables: Iterable, max_in_flight: int = 1,
+            scopes: list[dict] | None = None) -> list[Any]:
+    """Call ``func`` over zipped ``iterables`` with at most ``max_in_flight`` calls running.
+
+    Behaves like ``list(map(func, *iterables))``: results come back in
+    input order regardless of completion order, so callers can join them
+    back into the graph deterministically. The first exception raised by
+    any call is re-raised here.
+
+    ``scopes`` optionally gives each call a telemetry scope (e.g.
+    ``{"claim": 2}``); the caller's context, including its scope, is
+    carried into the worker threads.
+
+    max_in_flight <= 1 runs the calls sequentially on the calling thread.
+    """
+    args = list(zip(*iterables))
+    call_scopes = scopes if scopes is not None else [None] * len(args)
+
+    def call(a: tuple, s: dict | None) -> Any:
+        check_cancelled()
+        if s is None:
+            return func(*a)
+        with telemetry.scope(**s):
+            return func(*a)
+
+    if max_in_flight <= 1 or len(args) <= 1:
+        return [call(a, s) for a, s in zip(args, call_scopes)]
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(args))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, call, a, s)
+                   for a, s in zip(args, call_scopes)]
+        return [f.result() for f in futures]
+
+
+class Prefetcher:
+    """Start ``func(key, *args)`` calls early, in the background, and collect them later.
+
+    ``submit`` queues a call for a key as soon as the key is known (e.g. a
+    claim while the plan is still streaming); submitting the same key
+    again is a no-op. ``map`` then returns results for a final list of
+    keys in order, starting calls for keys never submitted. Calls run on
+    a pool of ``max_in_flight`` threads with the submitter's context, so
+    telemetry scopes and quota priority carry over. Results for keys that
+    ``map`` never asks for are discarded by ``close``.
+    """
+
+    def __init__(self, func: Callable[..., Any], *args: Any, max_in_flight: int = 1):
+        self.func = func
+        self.args = args
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_in_flight))
+        self._futures: dict[Any, Any] = {}
+
+    def submit(self, key: Any, scope: dict | None = None) -> None:
+        if key in self._futures:
+            return
+
+        def call() -> Any:
+            check_cancelled()
+            if scope is None:
+                return self.func(key, *self.args)
+            with telemetry.scope(**scope):
+                return self.func(key, *self.args)
+
+        self._futures[key] = self._pool.submit(contextvars.copy_context().run, call)
+
+    @property
+    def submitted(self) -> int:
+        return len(self._futures)
+
+    def map(self, keys: list[Any], scopes: list[dict] | None = None) -> list[Any]:
+        """Results for ``keys`` in order; the first exception raised by any call is re-raised."""
+        for i, key in enumerate(keys):
+            self.submit(key, scopes[i] if scopes is not None else None)
+        return [self._futures[key].result() for key in keys]
+
+    def close(self) -> None:
+        """Cancel calls that have not started and release the pool."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,103 @@
+"""TrustGraph event stream — machine-readable NDJSON progress events.
+
+The agent reports its progress as one JSON object per line so that a UI
+or other consumer can render results while the run is still going:
+
+    {"event": "stage_start", "stage": "search", "ts": ...}
+    {"event": "stage_end", "stage": "search", "elapsed_ms": 812.4, "ts": ...}
+    {"event": "claim", "index": 0, "claim": {...JSON-LD...}, "ts": ...}
+    {"event": "conflict", "index": 0, "conflict": {...}, "ts": ...}
+    {"event": "run_end", "elapsed_ms": 9120.7, "report": {...}, "ts": ...}
+
+Set TRUSTGRAPH_EVENTS to a file path to enable the stream, or to "-" to
+write it to stdout. Events are flushed line by line.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any
+
+
+class EventStream:
+    """Thread-safe NDJSON event writer. A stream with no target is a no-op."""
+
+    def __init__(self, target: str | None = None):
+        self._lock = threading.Lock()
+        self._stage_started: dict[str, float] = {}
+        self._run_started = time.perf_counter()
+        if not target:
+            self._fh = None
+        elif target == "-":
+            self._fh = sys.stdout
+        else:
+            self._fh = open(target, "a", encoding="utf-8", buffering=1)
+
+    @property
+    def enabled(self) -> bool:
+        return self._fh is not None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Write one event line."""
+        if self._fh is None:
+            return
+        record = {"event": event, "ts": time.time(), **fields}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+    def run_start(self, **fields: Any) -> None:
+        self._run_started = time.perf_counter()
+        self.emit("run_start", **fields)
+
+    def run_end(self, **fields: Any) -> None:
+        elapsed = (time.perf_counter() - self._run_started) * 1000
+        self.emit("run_end", elapsed_ms=round(elapsed, 1), **fields)
+
+    def stage_start(self, stage: str, **fields: Any) -> None:
+        self._stage_started[stage] = time.perf_counter()
+        self.emit("stage_start", stage=stage, **fields)
+
+    def stage_end(self, stage: str, **fields: Any) -> None:
+        started = self._stage_started.pop(stage, None)
+        elapsed = (time.perf_counter() - started) * 1000 if started is not None else None
+        self.emit("stage_end", stage=stage,
+                  elapsed_ms=round(elapsed, 1) if elapsed is not None else None, **fields)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None and self._fh is not sys.stdout:
+                self._fh.close()
+            self._fh = None
+
+
+def get_event_stream() -> EventStream:
+    """Open a new event stream on the target named by TRUSTGRAPH_EVENTS."""
+    return EventStream(os.environ.get("TRUSTGRAPH_EVENTS", ""))
+
+
+def read_events(path: str, offset: int = 0) -> tuple[list[dict], int]:
+    """Read complete event lines appended to ``path`` since ``offset``.
+
+    Returns (events, new_offset). A partially written trailing line is
+    left for the next call.
+    """
+    if not os.path.exists(path):
+        return [], offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read()
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return [], offset
+    events = []
+    for line in chunk[:end].splitlines():
+        if line.strip():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events, offset + end + 1
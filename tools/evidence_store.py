@@ -0,0 +1,360 @@
+"""TrustGraph evidence store — columnar, memory-mapped history of scored evidence.
+
+Every run appends its scored evidence rows here. Each column is a flat
+little-endian binary file in the store directory, so opening the store
+reads one small ``meta.json`` and maps the columns with ``np.memmap``:
+nothing is parsed or copied until it is touched, and millions of rows
+open instantly.
+
+Evidence columns (one row per piece of evidence, ~65 bytes):
+
+    opinions     float64 (n, 4)  belief, disbelief, uncertainty, base_rate —
+                                 trust-discounted and oriented towards the claim
+    trust        float32         source trust score
+    relevance    float32         LLM-assessed relevance
+    confidence   float32         raw LLM confidence
+    supports     uint8           1 = supports the claim, 0 = contradicts
+    claim_id     int64           row of the claim table
+    source_id    int32           interned source URL
+    text_id      int32           interned evidence text
+    group_id     int32           interned duplicate-group key (tools/source_registry.py)
+
+Claim columns (one row per stored claim): ``claim_text``, ``claim_query``
+(interned strings), ``claim_run``, ``claim_start`` / ``claim_count`` (its
+contiguous evidence rows) and ``claim_time``.
+
+Strings are interned once in ``strings.col`` (UTF-8) with end offsets in
+``strings_off.col`` and a 64-bit BLAKE2 hash per string in
+``strings_hash.col``, so a writer loads the intern table from the hashes
+alone. Rows are appended by one writer at a time, serialized
+across processes with a lock file. ``meta.json`` is replaced atomically
+after the column files are written, so readers and later writers ignore
+any tail left by a crashed append.
+
+``opinions`` and ``claim_id`` plug straight into ``bridge.batch``:
+
+    store = get_evidence_store()
+    ids, fused = batch_fuse_evidence(store.column("opinions"), store.column("claim_id"))
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Iterator
+
+import numpy as np
+
+from bridge.batch import batch_fuse_evidence
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Set TRUSTGRAPH_EVIDENCE_STORE to an empty string to disable.
+EVIDENCE_STORE_PATH = os.environ.get(
+    "TRUSTGRAPH_EVIDENCE_STORE", os.path.join(PROJECT_ROOT, ".cache", "evidence")
+)
+
+STORE_VERSION = 1
+# name -> (dtype, values per row)
+EVIDENCE_COLUMNS = {
+    "opinions": ("<f8", 4),
+    "trust": ("<f4", 1),
+    "relevance": ("<f4", 1),
+    "confidence": ("<f4", 1),
+    "supports": ("u1", 1),
+    "claim_id": ("<i8", 1),
+    "source_id": ("<i4", 1),
+    "text_id": ("<i4", 1),
+    "group_id": ("<i4", 1),
+}
+CLAIM_COLUMNS = {
+    "claim_text": ("<i4", 1),
+    "claim_query": ("<i4", 1),
+    "claim_run": ("<i4", 1),
+    "claim_start": ("<i8", 1),
+    "claim_count": ("<i4", 1),
+    "claim_time": ("<f8", 1),
+}
+
+
+class EvidenceStore:
+    """Append-only columnar store of scored evidence, read through memory maps."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: dict[str, np.ndarray] = {}
+        self._intern: dict[int, int] = {}  # string hash -> id
+        self._interned = 0  # strings loaded into _intern
+        self.meta = self._read_meta()
+
+    # ── Layout ──
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.col")
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(os.path.join(self.path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {"version": STORE_VERSION, "rows": 0, "claims": 0, "runs": 0,
+                    "strings": 0, "string_bytes": 0}
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"unsupported evidence store version {meta.get('version')} in {self.path}")
+        return meta
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _map(self, name: str, dtype: str, width: int, count: int) -> np.ndarray:
+        shape = (count, width) if width > 1 else (count,)
+        if count == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    # ── Reading ──
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def num_claims(self) -> int:
+        return self.meta["claims"]
+
+    def refresh(self) -> None:
+        """Pick up rows appended since this store was opened (e.g. by another process)."""
+        meta = self._read_meta()
+        if meta != self.meta:
+            self.meta = meta
+            self._maps.clear()
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of one evidence or claim column."""
+        array = self._maps.get(name)
+        if array is None:
+            if name in EVIDENCE_COLUMNS:
+                dtype, width = EVIDENCE_COLUMNS[name]
+                count = self.meta["rows"]
+            elif name in CLAIM_COLUMNS:
+                dtype, width = CLAIM_COLUMNS[name]
+                count = self.meta["claims"]
+            else:
+                raise KeyError(f"no column {name!r}")
+            array = self._maps[name] = self._map(name, dtype, width, count)
+        return array
+
+    def string(self, sid: int) -> str:
+        """The interned string with id ``sid``."""
+        if "_offsets" not in self._maps:
+            self._maps["_offsets"] = self._map("strings_off", "<i8", 1, self.meta["strings"])
+            self._maps["_bytes"] = self._map("strings", "u1", 1, self.meta["string_bytes"])
+        return _read_string(self._maps["_offsets"], self._maps["_bytes"], sid)
+
+    def string_id(self, text: str) -> int | None:
+        """Id of an interned string, or None."""
+        with self._lock:
+            self._sync_strings(self.meta)
+            sid = self._intern.get(_string_hash(text))
+        return sid if sid is not None and self.string(sid) == text else None
+
+    def claim(self, claim_id: int) -> dict[str, Any]:
+        """One stored claim with its evidence row range."""
+        start = int(self.column("claim_start")[claim_id])
+        return {
+            "claim_id": claim_id,
+            "text": self.string(int(self.column("claim_text")[claim_id])),
+            "query": self.string(int(self.column("claim_query")[claim_id])),
+            "run": int(self.column("claim_run")[claim_id]),
+            "verified_at": float(self.column("claim_time")[claim_id]),
+            "rows": slice(start, start + int(self.column("claim_count")[claim_id])),
+        }
+
+    def fuse_claims(self) -> tuple[np.ndarray, np.ndarray]:
+        """Cumulative fusion of every stored claim's evidence, via ``batch_fuse_evidence``.
+
+        Returns (claim_ids, fused (k, 4)). Duplicate sources are not
+        collapsed here; ``group_id`` identifies them.
+        """
+        return batch_fuse_evidence(self.column("opinions"), self.column("claim_id"))
+
+    def stats(self) -> dict[str, Any]:
+        size = sum(
+            os.path.getsize(os.path.join(self.path, f))
+            for f in os.listdir(self.path) if f.endswith(".col")
+        )
+        return {"rows": self.meta["rows"], "claims": self.meta["claims"], "runs": self.meta["runs"],
+                "strings": self.meta["strings"], "bytes": size}
+
+    # ── Writing ──
+
+    @contextlib.contextmanager
+    def _writer(self) -> Iterator[dict]:
+        """Hold the in-process and cross-process write locks around an append."""
+        with self._lock, open(os.path.join(self.path, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield self._read_meta()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync_strings(self, meta: dict) -> None:
+        """Extend the intern table with strings added since it was last read."""
+        known = self._interned
+        if meta["strings"] <= known:
+            return
+        hashes = self._map("strings_hash", "<i8", 1, meta["strings"])[known:]
+        for sid, h in enumerate(hashes.tolist(), known):
+            self._intern.setdefault(h, sid)
+        self._interned = meta["strings"]
+
+    def _truncate(self, meta: dict) -> None:
+        """Drop any tail a crashed append left past the committed row counts."""
+        sizes = {name: meta["rows"] * np.dtype(dt).itemsize * w for name, (dt, w) in EVIDENCE_COLUMNS.items()}
+        sizes.update({name: meta["claims"] * np.dtype(dt).itemsize * w for name, (dt, w) in CLAIM_COLUMNS.items()})
+        sizes["strings"] = meta["string_bytes"]
+        sizes["strings_off"] = sizes["strings_hash"] = meta["strings"] * 8
+        for name, size in sizes.items():
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def append_run(self, query: str, claims: list[dict]) -> int:
+        """Append one run's scored claims and return its run id.
+
+        Each claim is ``{"text": str, "evidence": [row, ...]}`` where a row
+        has ``opinion`` (an Opinion or a (b, d, u, a) tuple), ``trust``,
+        ``relevance``, ``confidence``, ``supports``, ``url``, ``text`` and
+        optionally ``group`` (defaults to the URL).
+        """
+        with self._writer() as meta:
+            self._sync_strings(meta)
+            self._truncate(meta)
+            offsets = self._map("strings_off", "<i8", 1, meta["strings"])
+            data = self._map("strings", "u1", 1, meta["string_bytes"])
+            new_strings: list[bytes] = []
+            new_hashes: list[int] = []
+            pending: dict[int, int] = {}
+
+            def intern(text: str) -> int:
+                h = _string_hash(text)
+                sid = pending.get(h)
+                if sid is None:
+                    sid = self._intern.get(h)
+                    # A hash collision (vanishingly rare) just stores the string again
+                    if sid is None or _read_string(offsets, data, sid) != text:
+                        sid = pending[h] = meta["strings"] + len(new_strings)
+                        new_strings.append(text.encode("utf-8"))
+                        new_hashes.append(h)
+                return sid
+
+            run_id = meta["runs"]
+            now = time.time()
+            rows = [(meta["claims"] + ci, row) for ci, c in enumerate(claims) for row in c["evidence"]]
+            columns: dict[str, np.ndarray] = {
+                "opinions": np.array(
+                    [_opinion_tuple(row["opinion"]) for _, row in rows], dtype="<f8"
+                ).reshape(-1, 4),
+                "trust": np.array([row["trust"] for _, row in rows], dtype="<f4"),
+                "relevance": np.array([row["relevance"] for _, row in rows], dtype="<f4"),
+                "confidence": np.array([row["confidence"] for _, row in rows], dtype="<f4"),
+                "supports": np.array([bool(row["supports"]) for _, row in rows], dtype="u1"),
+                "claim_id": np.array([claim_id for claim_id, _ in rows], dtype="<i8"),
+                "source_id": np.array([intern(row["url"]) for _, row in rows], dtype="<i4"),
+                "text_id": np.array([intern(row["text"]) for _, row in rows], dtype="<i4"),
+                "group_id": np.array([intern(row.get("group") or row["url"]) for _, row in rows], dtype="<i4"),
+            }
+            counts = [len(c["evidence"]) for c in claims]
+            columns.update({
+                "claim_text": np.array([intern(c["text"]) for c in claims], dtype="<i4"),
+                "claim_query": np.full(len(claims), intern(query), dtype="<i4"),
+                "claim_run": np.full(len(claims), run_id, dtype="<i4"),
+                "claim_start": meta["rows"] + np.concatenate(([0], np.cumsum(counts)[:-1])).astype("<i8")
+                if claims else np.empty(0, dtype="<i8"),
+                "claim_count": np.array(counts, dtype="<i4"),
+                "claim_time": np.full(len(claims), now, dtype="<f8"),
+            })
+            if new_strings:
+                ends = meta["string_bytes"] + np.cumsum([len(s) for s in new_strings], dtype="<i8")
+                columns["strings"] = np.frombuffer(b"".join(new_strings), dtype="u1")
+                columns["strings_off"] = ends.astype("<i8")
+                columns["strings_hash"] = np.array(new_hashes, dtype="<i8")
+
+            for name, array in columns.items():
+                with open(self._file(name), "ab") as f:
+                    f.write(np.ascontiguousarray(array).tobytes())
+
+            meta.update(
+                rows=meta["rows"] + len(rows),
+                claims=meta["claims"] + len(claims),
+                runs=run_id + 1,
+                strings=meta["strings"] + len(new_strings),
+                string_bytes=meta["string_bytes"] + sum(len(s) for s in new_strings),
+            )
+            self._write_meta(meta)
+            self.meta = meta
+            self._maps.clear()
+            for h, sid in pending.items():
+                self._intern.setdefault(h, sid)
+            self._interned = meta["strings"]
+        return run_id
+
+
+def _read_string(offsets: np.ndarray, data: np.ndarray, sid: int) -> str:
+    start = int(offsets[sid - 1]) if sid > 0 else 0
+    return data[start:int(offsets[sid])].tobytes().decode("utf-8")
+
+
+def _string_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def _opinion_tuple(opinion: Any) -> tuple[float, float, float, float]:
+    if isinstance(opinion, (tuple, list)):
+        return tuple(float(v) for v in opinion)
+    return (float(opinion.belief), float(opinion.disbelief),
+            float(opinion.uncertainty), float(opinion.base_rate))
+
+
+_evidence_store: EvidenceStore | None = None
+_evidence_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> EvidenceStore | None:
+    """Return the shared evidence store, opening it on first use (None if disabled)."""
+    global _evidence_store
+    if _evidence_store is None and EVIDENCE_STORE_PATH:
+        with _evidence_store_lock:
+            if _evidence_store is None:
+                _evidence_store = EvidenceStore(EVIDENCE_STORE_PATH)
+    return _evidence_store
+
+
+def main() -> None:
+    """Print store statistics and time a full batch re-fusion of every claim."""
+    store = EvidenceStore(sys.argv[1] if len(sys.argv) > 1 else EVIDENCE_STORE_PATH)
+    stats = store.stats()
+    print(f"{stats['rows']} evidence rows, {stats['claims']} claims, {stats['runs']} runs, "
+          f"{stats['strings']} strings, {stats['bytes'] / 1e6:.1f} MB of columns")
+    started = time.perf_counter()
+    ids, fused = store.fuse_claims()
+    print(f"Re-fused {len(ids)} claims in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""TrustGraph graph store — durable, indexed history of every run's verification graph.
+
+The Query/Claim/Source/Evidence graph a run builds is written to SQLite
+in one transaction at the end of the run. Edges become foreign keys:
+
+    Spawns       Query -> Claim       claims.run_id
+    HasEvidence  Claim -> Evidence    evidence.claim_id
+    DerivedFrom  Evidence -> Source   evidence.source_id
+    DuplicateOf  Source -> Source     sources.duplicate_of
+
+Sources are shared across runs, keyed by canonical URL
+(tools/source_registry.py). Audit queries go through secondary indexes,
+never a full scan: a reversed host name makes "this domain and its
+subdomains" a range lookup, and per-source citation and contradiction
+counts plus a per-claim-text verdict history are maintained on insert.
+
+    python -m tools.graph_store domain nature.com
+    python -m tools.graph_store verdict-changes
+    python -m tools.graph_store contradicting
+    python -m tools.graph_store verdict refuted
+    python -m tools.graph_store history "Coffee reduces heart disease risk"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any
+from urllib.parse import urlsplit
+
+from tools.source_registry import canonical_url
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Set TRUSTGRAPH_GRAPH_STORE to an empty string to disable.
+GRAPH_STORE_PATH = os.environ.get(
+    "TRUSTGRAPH_GRAPH_STORE", os.path.join(PROJECT_ROOT, ".cache", "graph.sqlite3")
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    overall_confidence REAL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+
+CREATE TABLE IF NOT EXISTS claims (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    text TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    confidence REAL,
+    belief REAL,
+    disbelief REAL,
+    uncertainty REAL,
+    reused INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS claims_run ON claims (run_id);
+CREATE INDEX IF NOT EXISTS claims_hash ON claims (text_hash, created_at);
+CREATE INDEX IF NOT EXISTS claims_verdict ON claims (verdict, created_at);
+CREATE INDEX IF NOT EXISTS claims_created ON claims (created_at);
+
+CREATE TABLE IF NOT EXISTS claim_texts (
+    text_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    last_verdict TEXT NOT NULL,
+    verdict_changes INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS claim_texts_changed ON claim_texts (last_seen) WHERE verdict_changes > 0;
+
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    domain_rev TEXT NOT NULL,
+    title TEXT,
+    trust_score REAL,
+    fingerprint TEXT,
+    duplicate_of INTEGER REFERENCES sources (id),
+    cited INTEGER NOT NULL DEFAULT 0,
+    contradicted INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_domain ON sources (domain_rev);
+CREATE INDEX IF NOT EXISTS sources_contradicted ON sources (contradicted);
+CREATE INDEX IF NOT EXISTS sources_duplicate ON sources (duplicate_of) WHERE duplicate_of IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS evidence (
+    id INTEGER PRIMARY KEY,
+    claim_id INTEGER NOT NULL REFERENCES claims (id),
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    text TEXT NOT NULL,
+    supports INTEGER NOT NULL,
+    relevance REAL,
+    confidence_raw REAL,
+    trust_score REAL
+);
+CREATE INDEX IF NOT EXISTS evidence_claim ON evidence (claim_id);
+CREATE INDEX IF NOT EXISTS evidence_source ON evidence (source_id);
+"""
+
+
+def claim_text_hash(text: str) -> str:
+    """Hash of a claim's normalized text (case, whitespace and punctuation ignored)."""
+    normalized = " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def reversed_domain(host: str) -> str:
+    """'www.nature.com' -> 'com.nature': subdomains of a domain share its prefix."""
+    host = host.lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return ".".join(reversed(host.split(".")))
+
+
+class GraphStore:
+    """SQLite store of verification graphs with indexes for cross-run audit queries.
+
+    Safe to share between threads; SQLite's file locking makes it safe
+    to share between processes on one host.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ── Writing ──
+
+    def record_run(self, query: str, claims: list[dict], overall_confidence: float | None = None,
+                   summary: str = "", created_at: float | None = None) -> int:
+        """Insert one run's graph in a single transaction and return its run id.
+
+        Each claim is ``{"text", "verdict", "confidence", "opinion", "evidence",
+        "reused"}``: ``opinion`` is an ``opinion_summary`` dict (or empty) and
+        ``evidence`` a list of rows with ``url``, ``title``, ``trust``,
+        ``text``, ``supports``, ``relevance``, ``confidence`` and optionally
+        ``key``, ``fingerprint`` and ``duplicate_of`` (the URL of the page it
+        copies).
+        """
+        now = time.time() if created_at is None else created_at
+        with self._lock, self._conn:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (query, created_at, overall_confidence, summary) VALUES (?, ?, ?, ?)",
+                (query, now, overall_confidence, summary),
+            ).lastrowid
+
+            rows = [row for c in claims for row in c.get("evidence", [])]
+            source_ids = self._upsert_sources(rows, now)
+
+            evidence_params = []
+            for c in claims:
+                opinion = c.get("opinion") or {}
+                claim_id = self._conn.execute(
+                    "INSERT INTO claims (run_id, text, text_hash, verdict, confidence, belief,"
+                    " disbelief, uncertainty, reused, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, c["text"], claim_text_hash(c["text"]), c.get("verdict", "unverified"),
+                     c.get("confidence"), opinion.get("belief"), opinion.get("disbelief"),
+                     opinion.get("uncertainty"), int(bool(c.get("reused"))), now),
+                ).lastrowid
+                for row in c.get("evidence", []):
+                    evidence_params.append((
+                        claim_id, source_ids[row.get("key") or canonical_url(row["url"])], row["text"],
+                        int(bool(row["supports"])), row.get("relevance"), row.get("confidence"),
+                        row.get("trust"),
+                    ))
+            self._conn.executemany(
+                "INSERT INTO evidence (claim_id, source_id, text, supports, relevance,"
+                " confidence_raw, trust_score) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                evidence_params,
+            )
+
+            self._conn.executemany(
+                "INSERT INTO claim_texts (text_hash, text, runs, last_verdict, first_seen, last_seen)"
+                " VALUES (?, ?, 1, ?, ?, ?)"
+                " ON CONFLICT (text_hash) DO UPDATE SET"
+                "  runs = runs + 1,"
+                "  verdict_changes = verdict_changes + (last_verdict != excluded.last_verdict),"
+                "  last_verdict = excluded.last_verdict,"
+                "  last_seen = excluded.last_seen",
+                [(claim_text_hash(c["text"]), c["text"], c.get("verdict", "unverified"), now, now)
+                 for c in claims],
+            )
+        return run_id
+
+    def _upsert_sources(self, rows: list[dict], now: float) -> dict[str, int]:
+        """Insert or refresh every source in ``rows``; returns canonical key -> id."""
+        by_key: dict[str, dict] = {}
+        cited: Counter = Counter()
+        contradicted: Counter = Counter()
+        for row in rows:
+            key = row.get("key") or canonical_url(row["url"])
+            by_key.setdefault(key, row)
+            cited[key] += 1
+            contradicted[key] += 0 if row["supports"] else 1
+
+        self._conn.executemany(
+            "INSERT INTO sources (key, url, domain_rev, title, trust_score, fingerprint,"
+            " first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET"
+            "  title = excluded.title, trust_score = excluded.trust_score,"
+            "  fingerprint = excluded.fingerprint, last_seen = excluded.last_seen",
+            [(key, row["url"], reversed_domain(urlsplit(row["url"]).hostname or ""),
+              row.get("title", ""), row.get("trust"), row.get("fingerprint"), now, now)
+             for key, row in by_key.items()],
+        )
+        keys = list(by_key)
+        ids = self._source_ids(keys)
+
+        self._conn.executemany(
+            "UPDATE sources SET cited = cited + ?, contradicted = contradicted + ? WHERE id = ?",
+            [(cited[key], contradicted[key], ids[key]) for key in keys],
+        )
+        duplicates = [
+            (ids.get(canonical_url(row["duplicate_of"])), ids[key])
+            for key, row in by_key.items() if row.get("duplicate_of")
+        ]
+        self._conn.executemany(
+            "UPDATE sources SET duplicate_of = ? WHERE id = ?",
+            [(dup, source_id) for dup, source_id in duplicates if dup is not None],
+        )
+        return ids
+
+    def _source_ids(self, keys: list[str]) -> dict[str, int]:
+        ids: dict[str, int] = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for source_id, key in self._conn.execute(
+                f"SELECT id, key FROM sources WHERE key IN ({marks})", chunk
+            ):
+                ids[key] = source_id
+        return ids
+
+    # ── Bulk reads (tools/trust_propagation.py) ──
+
+    def source_ids(self, keys: list[str]) -> dict[str, int]:
+        """Canonical source key -> id for the keys already stored."""
+        with self._lock:
+            return self._source_ids(list(keys))
+
+    def sources_since(self, after_id: int = 0) -> list[tuple[int, str]]:
+        """``(id, url)`` of every source with id above ``after_id``."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, url FROM sources WHERE id > ? ORDER BY id", (after_id,)
+            ).fetchall()
+
+    def duplicate_links(self) -> list[tuple[int, int]]:
+        """``(source id, id of the page it copies)`` for every known near-copy."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, duplicate_of FROM sources WHERE duplicate_of IS NOT NULL"
+            ).fetchall()
+
+    def evidence_stances(self, after_id: int = 0,
+                         text_hashes: list[str] | None = None) -> list[tuple[int, str, int, int]]:
+        """``(evidence id, claim text hash, source id, supports)`` rows.
+
+        Either every row with evidence id above ``after_id``, or (with
+        ``text_hashes``) every row for those claim texts.
+        """
+        sql = ("SELECT e.id, c.text_hash, e.source_id, e.supports"
+               " FROM evidence e JOIN claims c ON c.id = e.claim_id")
+        with self._lock:
+            if text_hashes is None:
+                return self._conn.execute(sql + " WHERE e.id > ?", (after_id,)).fetchall()
+            rows = []
+            for start in range(0, len(text_hashes), 500):
+                chunk = text_hashes[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows.extend(self._conn.execute(sql + f" WHERE c.text_hash IN ({marks})", chunk))
+            return rows
+
+    # ── Audit queries ──
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def claims_citing_domain(self, domain: str, limit: int = 100) -> list[dict[str, Any]]:
+        """Claims with evidence from ``domain`` or any of its subdomains, newest first."""
+        rev = reversed_domain(domain)
+        return self._query(
+            "SELECT c.id AS claim_id, c.text, c.verdict, c.confidence, c.created_at,"
+            " s.url, e.supports, e.text AS evidence"
+            " FROM sources s"
+            " JOIN evidence e ON e.source_id = s.id"
+            " JOIN claims c ON c.id = e.claim_id"
+            " WHERE s.domain_rev = ? OR (s.domain_rev > ? AND s.domain_rev < ?)"
+            " ORDER BY c.created_at DESC LIMIT ?",
+            (rev, rev + ".", rev + "/", limit),
+        )
+
+    def verdict_changes(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Claim texts whose verdict changed between runs, with their verdict history."""
+        changed = self._query(
+            "SELECT text_hash, text, runs, last_verdict, verdict_changes, last_seen"
+            " FROM claim_texts WHERE verdict_changes > 0 ORDER BY last_seen DESC LIMIT ?",
+            (limit,),
+        )
+        for c in changed:
+            c["history"] = self._query(
+                "SELECT run_id, verdict, confidence, created_at FROM claims"
+                " WHERE text_hash = ? ORDER BY created_at",
+                (c["text_hash"],),
+            )
+        return changed
+
+    def top_contradicting_sources(self, limit: int = 20) -> list[dict[str, Any]]:
+        """Sources whose evidence contradicted claims most often."""
+        return self._query(
+            "SELECT id, url, title, trust_score, cited, contradicted,"
+            " ROUND(1.0 * contradicted / cited, 4) AS contradiction_rate"
+            " FROM sources WHERE contradicted > 0 ORDER BY contradicted DESC LIMIT ?",
+            (limit,),
+        )
+
+    def claims_by_verdict(self, verdict: str, since: float = 0.0, limit: int = 100) -> list[dict[str, Any]]:
+        """Claims with a given verdict, newest first, optionally only after ``since``."""
+        return self._query(
+            "SELECT id AS claim_id, run_id, text, confidence, created_at FROM claims"
+            " WHERE verdict = ? AND created_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (verdict, since, limit),
+        )
+
+    def claim_history(self, text: str) -> list[dict[str, Any]]:
+        """Every verification of a claim text (normalized), oldest first."""
+        return self._query(
+            "SELECT c.id AS claim_id, c.run_id, r.query, c.verdict, c.confidence, c.created_at"
+            " FROM claims c JOIN runs r ON r.id = c.run_id"
+            " WHERE c.text_hash = ? ORDER BY c.created_at",
+            (claim_text_hash(text),),
+        )
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("runs", "claims", "sources", "evidence")
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_graph_store: GraphStore | None = None
+_graph_store_lock = threading.Lock()
+
+
+def get_graph_store() -> GraphStore | None:
+    """Return the shared graph store, opening it on first use (None if disabled)."""
+    global _graph_store
+    if _graph_store is None and GRAPH_STORE_PATH:
+        with _graph_store_lock:
+            if _graph_store is None:
+                _graph_store = GraphStore(GRAPH_STORE_PATH)
+    return _graph_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the TrustGraph run history")
+    parser.add_argument("--db", default=GRAPH_STORE_PATH)
+    parser.add_argument("--limit", type=int, default=20)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("domain", help="Claims citing a domain").add_argument("domain")
+    sub.add_parser("verdict-changes", help="Claims whose verdict changed between runs")
+    sub.add_parser("contradicting", help="Sources that contradict claims most often")
+    sub.add_parser("verdict", help="Claims with a verdict").add_argument("verdict")
+    sub.add_parser("history", help="Every verification of a claim").add_argument("text")
+    sub.add_parser("stats", help="Row counts")
+    args = parser.parse_args()
+
+    store = GraphStore(args.db)
+    if args.command == "domain":
+        result: Any = store.claims_citing_domain(args.domain, args.limit)
+    elif args.command == "verdict-changes":
+        result = store.verdict_changes(args.limit)
+    elif args.command == "contradicting":
+        result = store.top_contradicting_sources(args.limit)
+    elif args.command == "verdict":
+        result = store.claims_by_verdict(args.verdict, limit=args.limit)
+    elif args.command == "history":
+        result = store.claim_history(args.text)
+    else:
+        result = store.stats()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
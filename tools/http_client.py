@@ -0,0 +1,216 @@
+"""TrustGraph HTTP client — pooled keep-alive connections with retries.
+
+A small stdlib-only client for JSON APIs such as Tavily. Connections are
+kept alive and reused per (scheme, host, port), so repeated calls skip
+the TCP and TLS handshakes. Requests that fail with 429, a 5xx status or
+a connection error are retried with jittered exponential backoff, and
+every call is bounded by an overall deadline.
+"""
+
+import http.client
+import json
+import random
+import socket
+import ssl
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+from urllib.parse import urlsplit
+
+from tools import telemetry
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPClientError(Exception):
+    """Raised when a request fails after all retries or runs past its deadline.
+
+    ``status`` is the last HTTP status received (None for connection
+    errors and timeouts) and ``attempts`` the number of tries made.
+    """
+
+    def __init__(self, message: str, status: int | None = None, attempts: int = 0):
+        super().__init__(message)
+        self.status = status
+        self.attempts = attempts
+
+
+class HTTPClient:
+    """Thread-safe JSON HTTP client with a keep-alive connection pool.
+
+    Args:
+        max_retries: Retries after the first attempt (so up to
+            max_retries + 1 tries in total).
+        backoff_base: Initial backoff in seconds; doubles per retry.
+        backoff_max: Upper bound for a single backoff sleep.
+        timeout: Per-attempt socket timeout in seconds.
+        deadline: Default overall time budget per call in seconds.
+        pool_size: Idle connections kept per host.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, timeout: float = 15.0,
+                 deadline: float = 30.0, pool_size: int = 8):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.deadline = deadline
+        self.pool_size = pool_size
+        self._idle: dict[tuple, list] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    # ── Connection pool ──
+
+    def _acquire(self, scheme: str, host: str, port: int | None, timeout: float):
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle[key]
+            conn = idle.pop() if idle else None
+        if conn is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(host, port, timeout=timeout,
+                                                   context=self._ssl_context)
+            else:
+                conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return key, conn
+
+    def _release(self, key: tuple, conn) -> None:
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close every idle pooled connection."""
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle.clear()
+        for idle in pools:
+            for conn in idle:
+                conn.close()
+
+    # ── Requests ──
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After."""
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def request(self, method: str, url: str, body: bytes | None = None,
+                headers: dict | None = None, deadline: float | None = None) -> tuple[int, bytes]:
+        """Send a request and return (status, body) for the first non-retryable response.
+
+        Raises:
+            HTTPClientError: on a retryable failure once retries are exhausted,
+                or when the deadline expires.
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = dict(headers or {})
+        headers.setdefault("Connection", "keep-alive")
+
+        budget = self.deadline if deadline is None else deadline
+        expires = time.monotonic() + budget
+        status = None
+        error = "no attempt made"
+
+        for attempt in range(self.max_retries + 1):
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                break
+            key, conn = self._acquire(parts.scheme, parts.hostname, parts.port,
+                                      min(self.timeout, remaining))
+            retry_after = None
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                status = resp.status
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self._release(key, conn)
+                if status not in RETRY_STATUSES:
+                    return status, data
+                error = f"HTTP {status}"
+                retry_after = resp.getheader("Retry-After")
+            except (http.client.HTTPException, OSError, socket.timeout) as e:
+                conn.close()
+                status = None
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                raise HTTPClientError(f"{method} {url} failed after {attempt + 1} attempts: {error}",
+                                      status=status, attempts=attempt + 1)
+            sleep = self._backoff(attempt, retry_after)
+            if time.monotonic() + sleep >= expires:
+                raise HTTPClientError(f"{method} {url} deadline of {budget}s exceeded: {error}",
+                                      status=status, attempts=attempt + 1)
+            telemetry.add_retry()
+            time.sleep(sleep)
+
+        raise HTTPClientError(f"{method} {url} deadline of {budget}s exceeded: {error}",
+                              status=status, attempts=self.max_retries + 1)
+
+    def post_json(self, url: str, payload: Any, headers: dict | None = None,
+                  deadline: float | None = None) -> Any:
+        """POST ``payload`` as JSON and return the decoded JSON response.
+
+        Raises:
+            HTTPClientError: on retry exhaustion, deadline expiry or a
+                non-2xx status.
+        """
+        hdrs = {"Content-Type": "application/json", "Accept": "application/json"}
+        hdrs.update(headers or {})
+        status, data = self.request("POST", url, json.dumps(payload).encode("utf-8"),
+                                    hdrs, deadline)
+        if not 200 <= status < 300:
+            raise HTTPClientError(f"POST {url} returned HTTP {status}: {data[:200]!r}",
+                                  status=status, attempts=1)
+        return json.loads(data.decode("utf-8"))
+
+
+class AsyncHTTPClient:
+    """asyncio front end for ``HTTPClient``.
+
+    Calls run on worker threads over the shared keep-alive pool, with at
+    most ``max_in_flight`` requests outstanding at once.
+    """
+
+    def __init__(self, client: HTTPClient | None = None, max_in_flight: int = 8):
+        self.client = client or HTTPClient()
+        self.max_in_flight = max_in_flight
+        self._semaphores: dict[int, "asyncio.Semaphore"] = {}
+
+    def _semaphore(self) -> "asyncio.Semaphore":
+        import asyncio
+
+        # One semaphore per running event loop
+        loop_id = id(asyncio.get_running_loop())
+        if loop_id not in self._semaphores:
+            self._semaphores[loop_id] = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphores[loop_id]
+
+    async def post_json(self, url: str, payload: Any, headers: dict | None = None,
+                        deadline: float | None = None) -> Any:
+        """Async ``HTTPClient.post_json``."""
+        import asyncio
+
+        async with self._semaphore():
+            return await asyncio.to_thread(self.client.post_json, url, payload, headers, deadline)
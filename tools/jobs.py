@@ -0,0 +1,405 @@
+"""TrustGraph job manager — isolated, queued verification runs for the UI.
+
+Every verification gets its own job ID and working directory
+(``.jobs/<job_id>/``) holding its ``_query.txt``, ``_config.json``,
+``events.ndjson`` and ``output.json``, so concurrent UI sessions never
+read or overwrite each other's files.
+
+Jobs wait in a priority queue (higher priority first, FIFO within a
+priority) and at most ``max_concurrent`` run at once. A job runs on the
+warm worker (tools/worker.py) when one is listening, otherwise as a
+``jac run trustgraph.jac`` subprocess pointed at its directory through
+TRUSTGRAPH_JOB_DIR. The worker runs one job at a time, so while it is
+listening jobs stay in this queue until its ``status`` reports it idle;
+queue depth and wait times then include the wait for the worker.
+
+    manager = JobManager(max_concurrent=2)
+    job = manager.submit("Is coffee healthy?", {"num_claims": 3})
+    for kind, item in manager.stream(job):   # ("log", line) / ("event", dict)
+        ...
+    manager.cancel(job.job_id)
+    manager.metrics()   # queue depth, running, wait-time stats
+"""
+
+import heapq
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Iterator
+
+from tools import worker
+from tools.events import read_events
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+JOBS_DIR = os.environ.get("TRUSTGRAPH_JOBS_DIR", os.path.join(PROJECT_ROOT, ".jobs"))
+MAX_CONCURRENT_JOBS = int(os.environ.get("TRUSTGRAPH_MAX_JOBS", 2))
+MAX_RETAINED_JOBS = int(os.environ.get("TRUSTGRAPH_JOBS_RETAINED", 50))
+WORKER_POLL_S = 0.2  # how often a runner waiting for the busy worker asks again
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """One verification run: its inputs, working directory, state and output channel."""
+
+    def __init__(self, query: str, options: dict, priority: int, workdir: str):
+        self.job_id = os.path.basename(workdir)
+        self.query = query
+        self.options = dict(options)
+        self.priority = priority
+        self.workdir = workdir
+        self.status = QUEUED
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.mode: str | None = None  # "worker" or "subprocess" once started
+        self.report: dict | None = None
+        self.error: str | None = None
+        self.output: queue.Queue = queue.Queue()
+        self.cancel_requested = threading.Event()
+        self._process: subprocess.Popen | None = None
+        self._sock = None
+
+    @property
+    def events_path(self) -> str:
+        return os.path.join(self.workdir, "events.ndjson")
+
+    @property
+    def output_path(self) -> str:
+        return os.path.join(self.workdir, "output.json")
+
+    @property
+    def wait_ms(self) -> float | None:
+        if self.started_at is None:
+            return None
+        return (self.started_at - self.submitted_at) * 1000
+
+    def put(self, kind: str, item: Any) -> None:
+        self.output.put((kind, item))
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "mode": self.mode,
+            "wait_ms": round(self.wait_ms, 1) if self.wait_ms is not None else None,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Bounded pool of job runners fed from a priority queue."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_JOBS, jobs_dir: str = JOBS_DIR,
+                 max_retained: int = MAX_RETAINED_JOBS):
+        self.max_concurrent = max(1, max_concurrent)
+        self.jobs_dir = jobs_dir
+        self.max_retained = max_retained
+        os.makedirs(jobs_dir, exist_ok=True)
+
+        self._lock = threading.Condition()
+        self._heap: list[tuple[int, int, Job]] = []
+        self._seq = 0
+        self._jobs: dict[str, Job] = {}
+        self._finished: deque[str] = deque()
+        self._running = 0
+        self._counts = {"submitted": 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        self._waits: deque[float] = deque(maxlen=500)
+        self._shutdown = False
+        self._worker_slot = threading.Lock()
+
+        self._threads = [
+            threading.Thread(target=self._run_loop, name=f"trustgraph-job-{i}", daemon=True)
+            for i in range(self.max_concurrent)
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ── Submission and control ──
+
+    def submit(self, query: str, options: dict | None = None, priority: int = 0) -> Job:
+        """Queue a verification. Higher ``priority`` runs first; ties are FIFO."""
+        job_id = uuid.uuid4().hex[:12]
+        workdir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(workdir)
+        job = Job(query, options or {}, priority, workdir)
+        with self._lock:
+            self._jobs[job_id] = job
+            heapq.heappush(self._heap, (-priority, self._seq, job))
+            self._seq += 1
+            self._counts["submitted"] += 1
+            position = self._queue_depth()
+            self._lock.notify()
+        job.put("event", {"event": "job_queued", "job_id": job_id, "position": position})
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it had already finished."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        with self._lock:
+            if job.status in FINISHED:
+                return False
+            job.cancel_requested.set()
+            if job.status == QUEUED:
+                # Lazily dropped from the heap when a runner pops it
+                self._finish(job, CANCELLED)
+                return True
+        # Running: stop the subprocess, or hang up on the worker, which
+        # then stops the job at its next stage or fan-out wave
+        if job._process is not None and job._process.poll() is None:
+            job._process.terminate()
+        if job._sock is not None:
+            try:
+                job._sock.shutdown(socket.SHUT_RDWR)
+                job._sock.close()
+            except OSError:
+                pass
+        return True
+
+    def stream(self, job: Job, poll: float = 0.2) -> Iterator[tuple[str, Any]]:
+        """Yield a job's ("log", line) and ("event", dict) output until it finishes."""
+        while True:
+            try:
+                item = job.output.get(timeout=poll)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            yield item
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._shutdown = True
+            self._lock.notify_all()
+
+    # ── Metrics ──
+
+    def _queue_depth(self) -> int:
+        return sum(1 for _, _, j in self._heap if j.status == QUEUED)
+
+    def metrics(self) -> dict:
+        """Queue depth, running count, outcome counters and recent wait-time stats."""
+        with self._lock:
+            waits = sorted(self._waits)
+            out = {
+                "queue_depth": self._queue_depth(),
+                "running": self._running,
+                "max_concurrent": self.max_concurrent,
+                **self._counts,
+            }
+        if waits:
+            out["wait_ms_avg"] = round(sum(waits) / len(waits), 1)
+            out["wait_ms_p95"] = round(waits[min(len(waits) - 1, int(0.95 * len(waits)))], 1)
+            out["wait_ms_max"] = round(waits[-1], 1)
+        else:
+            out["wait_ms_avg"] = out["wait_ms_p95"] = out["wait_ms_max"] = 0.0
+        return out
+
+    # ── Runners ──
+
+    def _wait_for_job(self) -> bool:
+        """Block until a job is queued. Returns False on shutdown."""
+        with self._lock:
+            while not self._shutdown:
+                if self._queue_depth():
+                    return True
+                self._lock.wait()
+            return False
+
+    def _next_job(self) -> Job | None:
+        """Start the highest-priority queued job, or None if another runner took it."""
+        with self._lock:
+            while self._heap and not self._shutdown:
+                _, _, job = heapq.heappop(self._heap)
+                if job.status == QUEUED:
+                    job.status = RUNNING
+                    job.started_at = time.time()
+                    self._running += 1
+                    self._waits.append(job.wait_ms)
+                    return job
+            return None
+
+    def _claim_worker(self) -> bool:
+        """Hold the worker's single job slot once it is idle.
+
+        Called with a job waiting, so the worker's status is fresh when the
+        job starts. Returns False, without the slot, if no worker is listening.
+        """
+        if worker.status() is None:
+            return False
+        self._worker_slot.acquire()
+        while not self._shutdown:
+            state = worker.status()
+            if state is None:
+                self._worker_slot.release()
+                return False
+            if not state.get("busy"):
+                break
+            time.sleep(WORKER_POLL_S)
+        return True
+
+    def _run_loop(self) -> None:
+        while True:
+            if not self._wait_for_job():
+                return
+            use_worker = self._claim_worker()
+            try:
+                job = self._next_job()
+                if job is None:
+                    continue
+                status = FAILED
+                try:
+                    self._execute(job, use_worker)
+                    if job.cancel_requested.is_set():
+                        status = CANCELLED
+                    elif job.error is None:
+                        status = DONE
+                except Exception as e:
+                    job.error = f"{type(e).__name__}: {e}"
+                finally:
+                    with self._lock:
+                        self._running -= 1
+                        self._finish(job, status)
+            finally:
+                if use_worker:
+                    self._worker_slot.release()
+
+    def _finish(self, job: Job, status: str) -> None:
+        """Record a job's outcome and close its output channel. Caller holds the lock."""
+        job.status = status
+        job.finished_at = time.time()
+        self._counts[status] += 1
+        if status == CANCELLED and job.error is None:
+            job.error = "cancelled"
+        job.put("event", {"event": "job_end", **job.to_dict()})
+        job.output.put(None)
+        self._finished.append(job.job_id)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs and delete their working directories."""
+        while len(self._finished) > self.max_retained:
+            old = self._jobs.pop(self._finished.popleft(), None)
+            if old is not None:
+                shutil.rmtree(old.workdir, ignore_errors=True)
+
+    def _execute(self, job: Job, use_worker: bool) -> None:
+        if job.cancel_requested.is_set():
+            return
+        launched = time.perf_counter()
+        sock = worker.connect() if use_worker else None
+        if sock is not None:
+            job.mode = "worker"
+            job._sock = sock
+            stream = _run_on_worker(job, sock)
+        else:
+            job.mode = "subprocess"
+            stream = _run_subprocess(job)
+
+        job.put("event", {"event": "job_start", **job.to_dict()})
+        for kind, item in stream:
+            if kind == "event":
+                event = item.get("event")
+                if event == "run_start":
+                    job.put("event", {
+                        "event": "startup",
+                        "mode": job.mode,
+                        "overhead_ms": round((time.perf_counter() - launched) * 1000, 1),
+                    })
+                elif event == "run_end":
+                    job.report = item.get("report")
+                elif event == "job_error":
+                    job.error = item.get("error")
+            job.put(kind, item)
+
+        if job.report is None and os.path.exists(job.output_path):
+            with open(job.output_path, "r", encoding="utf-8") as f:
+                job.report = json.load(f)
+        if job.report is None and job.error is None and not job.cancel_requested.is_set():
+            job.error = "agent finished without a report"
+
+
+def _run_on_worker(job: Job, sock) -> Iterator[tuple[str, Any]]:
+    """Run a job on the warm worker and relay its output."""
+    options = {**job.options, "output_path": job.output_path}
+    payload = {"op": "verify", "query": job.query, "options": options}
+    try:
+        for event in worker.request(sock, payload):
+            if event.get("event") == "log":
+                yield ("log", event.get("line", ""))
+            elif event.get("event") not in ("job_start", "job_end"):
+                yield ("event", event)
+    except (OSError, ValueError):
+        # Closing the socket is how a running worker job is cancelled
+        if not job.cancel_requested.is_set():
+            raise
+
+
+def _run_subprocess(job: Job) -> Iterator[tuple[str, Any]]:
+    """Run a job as a fresh ``jac run`` subprocess in its own job directory."""
+    with open(os.path.join(job.workdir, "_query.txt"), "w", encoding="utf-8") as f:
+        f.write(job.query)
+    with open(os.path.join(job.workdir, "_config.json"), "w", encoding="utf-8") as f:
+        json.dump(job.options, f)
+
+    env = os.environ.copy()
+    env["PYTHONUNBUFFERED"] = "1"
+    env["TRUSTGRAPH_JOB_DIR"] = job.workdir
+    env["TRUSTGRAPH_EVENTS"] = job.events_path
+    job._process = process = subprocess.Popen(
+        ["jac", "run", "trustgraph.jac"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    if job.cancel_requested.is_set():
+        process.terminate()
+
+    # Read stdout on a thread so events can be polled while the agent is quiet
+    lines: queue.Queue = queue.Queue()
+
+    def pump():
+        for line in process.stdout:
+            lines.put(line.rstrip())
+        lines.put(None)
+
+    threading.Thread(target=pump, daemon=True).start()
+
+    offset = 0
+    finished = False
+    while not finished:
+        try:
+            line = lines.get(timeout=0.2)
+            if line is None:
+                finished = True
+            else:
+                yield ("log", line)
+        except queue.Empty:
+            pass
+        events, offset = read_events(job.events_path, offset)
+        for event in events:
+            yield ("event", event)
+
+    process.wait()
+    events, offset = read_events(job.events_path, offset)
+    for event in events:
+        yield ("event", event)
+    if process.returncode != 0 and not job.cancel_requested.is_set():
+        job.error = f"agent exited with status {process.returncode}"
@@ -0,0 +1,179 @@
+"""TrustGraph LLM response cache — content-addressed memoization for byLLM calls.
+
+The agent's LLM functions (decompose_query, claim_to_search_query,
+extract_evidence, assess_claim, write_summary) are pure functions of
+their inputs. ``llm_cached`` memoizes them in a local SQLite store keyed
+by a hash of model name + function name + normalized arguments, so
+re-running a question — or one that overlaps earlier claims and
+sources — skips the calls that were already paid for. Calls that do go
+to the model wait for a slot in the shared quota scheduler
+(tools/quota.py) first.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from tools import quota, telemetry
+from tools.cache import DiskCache
+from tools.replay import through_cassette
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Set TRUSTGRAPH_LLM_CACHE to an empty string to disable.
+LLM_CACHE_PATH = os.environ.get(
+    "TRUSTGRAPH_LLM_CACHE", os.path.join(PROJECT_ROOT, ".cache", "llm.sqlite3")
+)
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("TRUSTGRAPH_LLM_CACHE_SIZE", 20000))
+RATE_LIMIT_RETRIES = 3
+
+_llm_cache: DiskCache | None = None
+_llm_cache_lock = threading.Lock()
+_stats: dict[str, dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def get_llm_cache() -> DiskCache | None:
+    """Return the shared LLM response cache, opening it on first use (None if disabled)."""
+    global _llm_cache
+    if _llm_cache is None and LLM_CACHE_PATH:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = DiskCache(LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES)
+    return _llm_cache
+
+
+def normalize_arg(value: Any) -> Any:
+    """Normalize an argument so insignificant differences share a cache entry.
+
+    Strings are stripped with internal whitespace collapsed, floats are
+    rounded to 4 places, and containers are normalized recursively.
+    """
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, bool) or value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, (list, tuple)):
+        return [normalize_arg(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): normalize_arg(v) for k, v in value.items()}
+    return str(value)
+
+
+def llm_cache_key(model: str, func_name: str, args: tuple, kwargs: dict | None = None) -> str:
+    """Content address for one LLM call: sha256 of model, function and normalized args."""
+    raw = json.dumps(
+        [model, func_name, normalize_arg(list(args)), normalize_arg(kwargs or {})],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return "llm:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _record(func_name: str, hit: bool) -> None:
+    with _stats_lock:
+        counters = _stats.setdefault(func_name, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+
+def llm_cached(model: str) -> Callable:
+    """Decorator memoizing an LLM-backed function in the persistent LLM cache.
+
+    Results must be JSON-serializable. Exceptions are not cached. Calls
+    also go through the active record/replay cassette (tools/replay.py).
+    """
+    def decorator(func: Callable) -> Callable:
+        func_name = getattr(func, "__name__", repr(func))
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with telemetry.span(func_name, "llm"):
+                key = llm_cache_key(model, func_name, args, kwargs)
+                return through_cassette("llm", func_name, key,
+                                        lambda: cached_call(key, args, kwargs))
+
+        def cached_call(key: str, args: tuple, kwargs: dict) -> Any:
+            cache = get_llm_cache()
+            if cache is None:
+                return scheduled_call(args, kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                _record(func_name, True)
+                telemetry.annotate(cache="hit")
+                return cached
+            _record(func_name, False)
+            telemetry.annotate(cache="miss")
+            result = scheduled_call(args, kwargs)
+            cache.set(key, result)
+            return result
+
+        def scheduled_call(args: tuple, kwargs: dict) -> Any:
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                waited = quota.acquire(model, quota.estimate_tokens(*args, *kwargs.values()))
+                if waited:
+                    telemetry.annotate(quota_wait_s=round(waited, 3))
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    # Provider-side 429: empty the shared bucket so every process backs off
+                    if type(e).__name__ != "RateLimitError" or attempt == RATE_LIMIT_RETRIES:
+                        raise
+                    quota.penalize(model)
+
+        return wrapper
+    return decorator
+
+
+def llm_cache_stats() -> dict[str, dict]:
+    """Per-function hit/miss counters and hit rate for this process."""
+    with _stats_lock:
+        snapshot = {name: dict(c) for name, c in _stats.items()}
+    for counters in snapshot.values():
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+    return snapshot
+
+
+# ── Deferred model clients ──
+# byllm.lib and litellm together take seconds to import. Runs that never reach
+# the model (cache or cassette hits, scoring only) should not pay for them.
+
+class LazyModel:
+    """Stand-in for byLLM's ``Model`` that imports byllm on the first ``by llm()`` call.
+
+    ``by llm()`` evaluates ``llm()`` each time the function is called, so the
+    real model is only built when a call actually reaches it.
+    """
+
+    def __init__(self, **kwargs: Any):
+        self._kwargs = kwargs
+        self._model = None
+        self._lock = threading.Lock()
+
+    def model(self) -> Any:
+        """The real ``byllm.lib.Model``, built on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from byllm.lib import Model
+                    self._model = Model(**self._kwargs)
+        return self._model
+
+    def __call__(self, **kwargs: Any) -> Any:
+        return self.model()(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model(), name)
+
+
+def litellm_completion(**kwargs: Any) -> Any:
+    """``litellm.completion``, imported on first use."""
+    from litellm import completion
+    return completion(**kwargs)
@@ -0,0 +1,174 @@
+"""TrustGraph streaming planner — hand claims to search while the plan is still streaming.
+
+``decompose_query_n`` asks the LLM for a JSON array of claim strings. With
+a planning sink installed (``stream_plan_to``), it requests a streamed
+completion and feeds the tokens through ``ClaimStreamParser``. Each
+array element is passed to the sink as soon as its closing quote
+arrives, so searches for the first claims start while later ones are
+still being generated.
+
+The streamed claims are only a head start. The complete response still
+goes through ``decompose_query_n``'s usual parsing (markdown fences, then
+the outermost ``[...]``, then the byLLM fallback), and that result is what
+gets cached and used. Searches for claims that did not survive are
+dropped.
+"""
+
+import contextlib
+import contextvars
+import json
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+_plan_sink: contextvars.ContextVar[Callable[[str], Any] | None] = contextvars.ContextVar(
+    "trustgraph_plan_sink", default=None
+)
+
+
+@contextlib.contextmanager
+def stream_plan_to(sink: Callable[[str], Any]):
+    """Pass each claim streamed by planners inside the block to ``sink``."""
+    token = _plan_sink.set(sink)
+    try:
+        yield
+    finally:
+        _plan_sink.reset(token)
+
+
+def clean_claim(value: Any) -> str | None:
+    """A planned claim as searched and verified: stripped, or None if unusable.
+
+    Streamed claims and the final plan go through the same normalization,
+    so a prefetched search is found again under the claim's final text.
+    """
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def clean_claims(values: Iterable[Any]) -> list[str]:
+    """``clean_claim`` over a parsed plan, dropping unusable entries."""
+    return [c for c in map(clean_claim, values) if c is not None]
+
+
+def plan_sink() -> Callable[[str], Any] | None:
+    """The active planning sink, or None when claims are not being streamed."""
+    return _plan_sink.get()
+
+
+class ClaimStreamParser:
+    """Incremental parser for a JSON array of strings arriving in arbitrary chunks.
+
+    Text before the opening ``[`` (a markdown fence, a sentence of preamble)
+    is skipped. Non-string elements are skipped without being returned,
+    and parsing stops at the closing ``]``.
+    """
+
+    def __init__(self):
+        self.claims: list[str] = []
+        self.done = False
+        self._buf = ""
+        self._pos = 0
+        self._in_array = False
+
+    def feed(self, text: str) -> list[str]:
+        """Add a chunk of the response; returns the claims it completed."""
+        if self.done or not text:
+            return []
+        self._buf += text
+        found: list[str] = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self.done:
+            if not self._in_array:
+                start = buf.find("[", i)
+                if start < 0:
+                    i = len(buf)
+                    break
+                self._in_array = True
+                i = start + 1
+                continue
+            ch = buf[i]
+            if ch in " \t\r\n,":
+                i += 1
+            elif ch == "]":
+                self.done = True
+                i += 1
+            elif ch == '"':
+                end = _string_end(buf, i)
+                if end < 0:
+                    break  # element still streaming
+                try:
+                    value = json.loads(buf[i:end + 1])
+                except ValueError:
+                    value = None
+                claim = clean_claim(value)
+                if claim is not None:
+                    found.append(claim)
+                i = end + 1
+            else:
+                end = _element_end(buf, i)
+                if end < 0:
+                    break
+                i = end
+        self._pos = i
+        self.claims.extend(found)
+        return found
+
+
+def _string_end(buf: str, start: int) -> int:
+    """Index of the quote closing the JSON string opened at ``start``, or -1 if not arrived yet."""
+    i = start + 1
+    while i < len(buf):
+        ch = buf[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == '"':
+            return i
+        i += 1
+    return -1
+
+
+def _element_end(buf: str, start: int) -> int:
+    """Index just past a non-string element (number, object, nested array), or -1."""
+    depth = 0
+    i = start
+    while i < len(buf):
+        ch = buf[i]
+        if ch == '"':
+            end = _string_end(buf, i)
+            if end < 0:
+                return -1
+            i = end + 1
+            continue
+        if ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            if depth == 0:
+                return i  # the enclosing array's ']'
+            depth -= 1
+        elif ch == "," and depth == 0:
+            return i
+        i += 1
+    return -1
+
+
+def stream_claims(chunks: Iterable[Any], sink: Callable[[str], Any]) -> str:
+    """Consume a streamed litellm completion, passing each completed claim to ``sink``.
+
+    Returns the full response text for the caller's usual parsing.
+    """
+    parser = ClaimStreamParser()
+    parts: list[str] = []
+    for chunk in chunks:
+        choices = getattr(chunk, "choices", None) or []
+        delta = getattr(choices[0], "delta", None) if choices else None
+        text = getattr(delta, "content", None) or ""
+        if not text:
+            continue
+        parts.append(text)
+        for claim in parser.feed(text):
+            sink(claim)
+    return "".join(parts)
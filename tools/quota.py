@@ -0,0 +1,312 @@
+"""TrustGraph quota scheduler — shared rate limits and monthly budgets for LLM and search calls.
+
+Every LLM call that misses the cache and every Tavily search acquires a
+slot here first. Limits come from ``tools/quotas.json`` (or the file
+named by ``TRUSTGRAPH_QUOTAS``), keyed by ``provider/model``:
+
+    {"gemini/gemini-2.5-flash": {"rpm": 1000, "tpm": 1000000},
+     "tavily/search": {"rpm": 100, "monthly": 1000}}
+
+- ``rpm`` / ``tpm``: token buckets refilled continuously, so bursts up
+  to a minute's allowance are allowed and the long-run rate never
+  exceeds the limit. LLM tokens are reserved from an estimate and
+  settled against litellm's reported usage when the call completes.
+- ``monthly``: a persistent ledger of requests (search credits) per
+  calendar month. A warning is printed at 80% and calls fail with
+  ``QuotaExhausted`` once it is spent.
+
+Callers over the limit wait instead of failing (back-pressure). The
+bucket state, ledger and waiter list live in one SQLite file, so every
+process on the host shares them. Waiting callers are served by priority
+class: ``interactive`` (UI jobs) before ``batch``. Set the class for a
+block of work with ``priority("batch")``; it carries into ``fan_out``
+threads.
+
+Set TRUSTGRAPH_QUOTA_DB to an empty string to disable scheduling.
+"""
+
+import contextlib
+import contextvars
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+QUOTA_DB_PATH = os.environ.get(
+    "TRUSTGRAPH_QUOTA_DB", os.path.join(PROJECT_ROOT, ".cache", "quota.sqlite3")
+)
+QUOTAS_PATH = os.environ.get(
+    "TRUSTGRAPH_QUOTAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "quotas.json")
+)
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+COMPLETION_TOKENS_ESTIMATE = 256
+WAITER_TTL = 10.0  # seconds before a silent waiter (e.g. a killed process) is ignored
+MAX_SLEEP = 1.0
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "trustgraph_priority", default=os.environ.get("TRUSTGRAPH_PRIORITY", "interactive")
+)
+
+
+class QuotaExhausted(RuntimeError):
+    """Raised when a call needs a monthly budget that has already been spent."""
+
+
+@contextlib.contextmanager
+def priority(name: str):
+    """Run the block's calls in priority class ``name`` ("interactive" or "batch")."""
+    if name not in PRIORITIES:
+        raise ValueError(f"priority must be one of {sorted(PRIORITIES)}, got {name!r}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(*values: Any) -> int:
+    """Prompt tokens for a call's arguments (~4 characters per token) plus a completion allowance."""
+    chars = sum(len(v) if isinstance(v, str) else len(json.dumps(v, default=str)) for v in values)
+    return math.ceil(chars / 4) + COMPLETION_TOKENS_ESTIMATE
+
+
+class QuotaScheduler:
+    """Token buckets, monthly ledger and priority waiters in a shared SQLite file."""
+
+    def __init__(self, path: str, limits: dict[str, dict]):
+        self.path = path
+        self.limits = limits
+        self.waited_s = 0.0
+        self._lock = threading.Lock()
+        self._warned: set[tuple[str, str, int]] = set()
+        self._reservations: dict[str, deque[int]] = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ledger ("
+            " key TEXT NOT NULL, month TEXT NOT NULL,"
+            " requests INTEGER NOT NULL DEFAULT 0, tokens INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (key, month))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS waiters ("
+            " waiter TEXT PRIMARY KEY, key TEXT NOT NULL, priority INTEGER NOT NULL, seen REAL NOT NULL)"
+        )
+
+    @classmethod
+    def from_file(cls, path: str = QUOTA_DB_PATH, quotas_path: str = QUOTAS_PATH) -> "QuotaScheduler":
+        limits: dict[str, dict] = {}
+        if quotas_path and os.path.exists(quotas_path):
+            with open(quotas_path, "r", encoding="utf-8") as f:
+                limits = json.load(f)
+        return cls(path, limits)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _level(self, conn: sqlite3.Connection, name: str, per_minute: float, now: float) -> float:
+        """Current bucket level after refilling at per_minute / 60 per second (capped at per_minute)."""
+        row = conn.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return float(per_minute)
+        return min(float(per_minute), row[0] + (now - row[1]) * per_minute / 60.0)
+
+    def _set_level(self, conn: sqlite3.Connection, name: str, level: float, now: float) -> None:
+        conn.execute("INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)",
+                     (name, level, now))
+
+    # ── Acquire / settle ──
+
+    def acquire(self, key: str, tokens: int = 0, cost: int = 1) -> float:
+        """Wait for one request (and ``tokens`` LLM tokens) under ``key``'s limits.
+
+        ``cost`` is what the request takes from the monthly budget (e.g. 2
+        credits for an advanced Tavily search). Returns the seconds spent
+        waiting. Raises QuotaExhausted if the monthly budget is spent.
+        """
+        limit = self.limits.get(key)
+        if not limit:
+            return 0.0
+        rpm, tpm, monthly = limit.get("rpm"), limit.get("tpm"), limit.get("monthly")
+        rank = PRIORITIES.get(_priority.get(), 0)
+        waiter = f"{os.getpid()}:{threading.get_ident()}:{key}"
+        started = time.time()
+        try:
+            while True:
+                now = time.time()
+                month = time.strftime("%Y-%m", time.gmtime(now))
+                with self._transaction() as conn:
+                    if monthly is not None:
+                        row = conn.execute("SELECT requests FROM ledger WHERE key = ? AND month = ?",
+                                           (key, month)).fetchone()
+                        used = row[0] if row else 0
+                        if used + cost > monthly:
+                            raise QuotaExhausted(f"{key}: monthly budget of {monthly} spent ({used} used in {month})")
+                    conn.execute("INSERT OR REPLACE INTO waiters (waiter, key, priority, seen) VALUES (?, ?, ?, ?)",
+                                 (waiter, key, rank, now))
+                    ahead = conn.execute(
+                        "SELECT COUNT(*) FROM waiters WHERE key = ? AND priority < ? AND seen > ?",
+                        (key, rank, now - WAITER_TTL),
+                    ).fetchone()[0]
+                    wait = 0.0
+                    if rpm:
+                        requests_level = self._level(conn, f"{key}:rpm", rpm, now)
+                        wait = max(wait, (1 - requests_level) * 60.0 / rpm)
+                    if tpm and tokens:
+                        tokens_level = self._level(conn, f"{key}:tpm", tpm, now)
+                        # A call bigger than the whole bucket waits for a full bucket
+                        wait = max(wait, (min(tokens, tpm) - tokens_level) * 60.0 / tpm)
+                    if not ahead and wait <= 0:
+                        if rpm:
+                            self._set_level(conn, f"{key}:rpm", requests_level - 1, now)
+                        if tpm and tokens:
+                            self._set_level(conn, f"{key}:tpm", tokens_level - tokens, now)
+                        conn.execute(
+                            "INSERT INTO ledger (key, month, requests, tokens) VALUES (?, ?, ?, ?)"
+                            " ON CONFLICT (key, month) DO UPDATE SET"
+                            "  requests = requests + excluded.requests, tokens = tokens + excluded.tokens",
+                            (key, month, cost, tokens),
+                        )
+                        conn.execute("DELETE FROM waiters WHERE waiter = ?", (waiter,))
+                        if monthly is not None:
+                            self._warn_if_low(key, month, used + cost, monthly)
+                        if tpm and tokens:
+                            self._reservations.setdefault(key, deque(maxlen=1024)).append(tokens)
+                        break
+                time.sleep(min(max(wait, 0.02), MAX_SLEEP))
+        except BaseException:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM waiters WHERE waiter = ?", (waiter,))
+            raise
+        waited = time.time() - started
+        self.waited_s += waited
+        return waited
+
+    def settle(self, key: str, actual_tokens: int) -> None:
+        """Replace the oldest outstanding token reservation for ``key`` with the real usage."""
+        limit = self.limits.get(key) or {}
+        tpm = limit.get("tpm")
+        reservations = self._reservations.get(key)
+        if not tpm or not reservations:
+            return
+        try:
+            reserved = reservations.popleft()
+        except IndexError:
+            return
+        delta = actual_tokens - reserved
+        now = time.time()
+        month = time.strftime("%Y-%m", time.gmtime(now))
+        with self._transaction() as conn:
+            self._set_level(conn, f"{key}:tpm", self._level(conn, f"{key}:tpm", tpm, now) - delta, now)
+            conn.execute("UPDATE ledger SET tokens = tokens + ? WHERE key = ? AND month = ?",
+                         (delta, key, month))
+
+    def penalize(self, key: str) -> None:
+        """Empty ``key``'s request bucket after a 429, so every process backs off."""
+        limit = self.limits.get(key) or {}
+        if limit.get("rpm"):
+            with self._transaction() as conn:
+                self._set_level(conn, f"{key}:rpm", 0.0, time.time())
+
+    def _warn_if_low(self, key: str, month: str, used: int, monthly: int) -> None:
+        for pct in (80, 100):
+            if used >= monthly * pct / 100 and (key, month, pct) not in self._warned:
+                self._warned.add((key, month, pct))
+                print(f"[WARN] {key}: {used} of {monthly} monthly requests used ({pct}%+)", file=sys.stderr)
+
+    def status(self) -> dict[str, dict]:
+        """Current bucket levels and this month's usage per configured key."""
+        now = time.time()
+        month = time.strftime("%Y-%m", time.gmtime(now))
+        out = {}
+        with self._transaction() as conn:
+            for key, limit in self.limits.items():
+                row = conn.execute("SELECT requests, tokens FROM ledger WHERE key = ? AND month = ?",
+                                   (key, month)).fetchone()
+                entry: dict[str, Any] = {"month": month, "requests": row[0] if row else 0,
+                                         "tokens": row[1] if row else 0, **limit}
+                if limit.get("rpm"):
+                    entry["rpm_available"] = round(self._level(conn, f"{key}:rpm", limit["rpm"], now), 1)
+                if limit.get("tpm"):
+                    entry["tpm_available"] = round(self._level(conn, f"{key}:tpm", limit["tpm"], now))
+                out[key] = entry
+        return out
+
+
+_scheduler: QuotaScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> QuotaScheduler | None:
+    """Return the shared scheduler, opening it on first use (None if disabled)."""
+    global _scheduler
+    if _scheduler is None and QUOTA_DB_PATH:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = QuotaScheduler.from_file()
+                _register_litellm_callback()
+    return _scheduler
+
+
+def acquire(key: str, tokens: int = 0, cost: int = 1) -> float:
+    """``QuotaScheduler.acquire`` on the shared scheduler (no-op when disabled)."""
+    scheduler = get_scheduler()
+    return scheduler.acquire(key, tokens, cost) if scheduler is not None else 0.0
+
+
+def penalize(key: str) -> None:
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        scheduler.penalize(key)
+
+
+def _usage_callback(kwargs, completion_response, start_time, end_time) -> None:
+    scheduler = _scheduler
+    usage = getattr(completion_response, "usage", None)
+    model = (kwargs or {}).get("model")
+    if scheduler is None or usage is None or not model:
+        return
+    total = int(getattr(usage, "total_tokens", 0) or 0)
+    # litellm may report the model without its provider prefix
+    for key in (model, *[k for k in scheduler.limits if k.endswith("/" + model)]):
+        if key in scheduler.limits:
+            scheduler.settle(key, total)
+            return
+
+
+def _register_litellm_callback() -> None:
+    try:
+        import litellm
+    except ImportError:
+        return
+    callbacks = getattr(litellm, "success_callback", None)
+    if isinstance(callbacks, list) and _usage_callback not in callbacks:
+        callbacks.append(_usage_callback)
+
+
+if __name__ == "__main__":
+    scheduler = QuotaScheduler.from_file()
+    print(json.dumps(scheduler.status(), indent=2))
@@ -0,0 +1,116 @@
+"""TrustGraph record/replay — run the pipeline offline from a cassette file.
+
+A cassette is a JSON file of captured LLM and web search responses, keyed
+the same way as the LLM and search caches (content hashes of the
+normalized call). In ``record`` mode every LLM call and ``web_search``
+runs normally and its result is written to the cassette. In ``replay``
+mode results come only from the cassette, so runs are deterministic and
+need no Gemini or Tavily keys. A call that was never recorded raises
+``CassetteMiss``.
+
+    TRUSTGRAPH_CASSETTE=bench/cassette.json TRUSTGRAPH_CASSETTE_MODE=record jac run trustgraph.jac
+    TRUSTGRAPH_CASSETTE=bench/cassette.json TRUSTGRAPH_CASSETTE_MODE=replay jac run trustgraph.jac
+
+or from Python: ``use_cassette("bench/cassette.json", "replay")``.
+"""
+
+import json
+import os
+import threading
+from typing import Any
+
+from tools import telemetry
+
+
+CASSETTE_VERSION = 1
+MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a call that is not in the cassette."""
+
+
+class Cassette:
+    """Recorded call results, persisted as JSON after every new entry."""
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("entries", {})
+        elif mode == "replay":
+            raise FileNotFoundError(f"cassette not found: {path}")
+
+    def lookup(self, key: str) -> Any:
+        """Replay one call. Raises CassetteMiss if it was not recorded."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                raise CassetteMiss(f"no recorded response for {key} in {self.path}")
+            self.hits += 1
+        return entry["value"]
+
+    def record(self, key: str, kind: str, name: str, value: Any) -> None:
+        """Store one call result and rewrite the cassette file."""
+        with self._lock:
+            self.entries[key] = {"kind": kind, "name": name, "value": value}
+            self.recorded += 1
+            self._save()
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CASSETTE_VERSION, "entries": self.entries}, f,
+                      indent=1, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"mode": self.mode, "entries": len(self.entries), "hits": self.hits,
+                    "misses": self.misses, "recorded": self.recorded}
+
+
+_cassette: Cassette | None = None
+_configured = False
+
+
+def use_cassette(path: str | None, mode: str = "replay") -> Cassette | None:
+    """Activate a cassette for this process (``path=None`` or mode "off" deactivates)."""
+    global _cassette, _configured
+    _configured = True
+    _cassette = Cassette(path, mode) if path and mode != "off" else None
+    return _cassette
+
+
+def get_cassette() -> Cassette | None:
+    """The active cassette, set up from TRUSTGRAPH_CASSETTE(_MODE) on first use."""
+    if not _configured:
+        use_cassette(os.environ.get("TRUSTGRAPH_CASSETTE", ""),
+                     os.environ.get("TRUSTGRAPH_CASSETTE_MODE", "replay"))
+    return _cassette
+
+
+def through_cassette(kind: str, name: str, key: str, call) -> Any:
+    """Run ``call()`` via the active cassette: replay it, or run it and record the result."""
+    cassette = get_cassette()
+    if cassette is None:
+        return call()
+    if cassette.mode == "replay":
+        telemetry.annotate(cache="replay")
+        return cassette.lookup(key)
+    result = call()
+    cassette.record(key, kind, name, result)
+    return result
@@ -0,0 +1,304 @@
+"""TrustGraph report archive — indexed local store of past JSON-LD reports.
+
+Every finished run's report is saved to SQLite (``.cache/reports.sqlite3``)
+in two parts:
+
+    reports         one row per run: query, time, precomputed verdict
+                    counts, mean probability, conflicts and summary, plus
+                    the whole report (zlib-compressed JSON)
+    report_claims   one row per claim: verdict, projected probability,
+                    source count and the claim's own JSON-LD
+
+A history list reads only the small ``reports`` columns, and a page of
+claims reads only its rows, through the (report, verdict, position)
+index. Neither parses the full report. That only happens when the
+complete JSON-LD is requested.
+
+    python -m tools.report_archive list --search coffee
+    python -m tools.report_archive show 42
+    python -m tools.report_archive import output.json examples/sample_output.jsonld
+
+Set TRUSTGRAPH_REPORT_ARCHIVE to an empty string to disable.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Iterator
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPORT_ARCHIVE_PATH = os.environ.get(
+    "TRUSTGRAPH_REPORT_ARCHIVE", os.path.join(PROJECT_ROOT, ".cache", "reports.sqlite3")
+)
+
+SUPPORTED_AT = 0.7  # projected probability at or above: supported
+REFUTED_AT = 0.3    # at or below: refuted; in between: contested
+VERDICTS = ("supported", "contested", "refuted")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    generated_at TEXT,
+    created_at REAL NOT NULL,
+    num_claims INTEGER NOT NULL,
+    supported INTEGER NOT NULL,
+    contested INTEGER NOT NULL,
+    refuted INTEGER NOT NULL,
+    num_conflicts INTEGER NOT NULL,
+    num_sources INTEGER NOT NULL,
+    mean_probability REAL,
+    summary TEXT,
+    conflicts TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    report BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_created ON reports (created_at);
+
+CREATE TABLE IF NOT EXISTS report_claims (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    verdict TEXT NOT NULL,
+    probability REAL NOT NULL,
+    num_sources INTEGER NOT NULL,
+    claim BLOB NOT NULL,
+    PRIMARY KEY (report_id, position)
+);
+CREATE INDEX IF NOT EXISTS report_claims_verdict ON report_claims (report_id, verdict, position);
+"""
+
+# Columns a history list needs; never the report blob
+_SUMMARY_COLUMNS = ("id, query, generated_at, created_at, num_claims, supported, contested, refuted,"
+                    " num_conflicts, num_sources, mean_probability, summary, size")
+
+
+def claim_verdict(prob: float) -> str:
+    """Verdict for a claim's projected probability."""
+    if prob >= SUPPORTED_AT:
+        return "supported"
+    elif prob > REFUTED_AT:
+        return "contested"
+    return "refuted"
+
+
+def claim_probability(claim: dict) -> float:
+    return float(claim.get("ex:confidence", {}).get("ex:projectedProbability", 0) or 0)
+
+
+def summarize_report(report: dict) -> dict[str, Any]:
+    """Verdict counts and headline metrics for a report, in one pass over its claims."""
+    counts = dict.fromkeys(VERDICTS, 0)
+    total_prob = 0.0
+    num_sources = 0
+    claims = report.get("ex:claims", [])
+    for claim in claims:
+        prob = claim_probability(claim)
+        counts[claim_verdict(prob)] += 1
+        total_prob += prob
+        num_sources += len(claim.get("ex:sources", []))
+    conflicts = report.get("ex:conflicts", [])
+    return {
+        "query": report.get("ex:query", ""),
+        "generated_at": report.get("ex:generatedAt"),
+        "num_claims": len(claims),
+        **counts,
+        "num_conflicts": len(conflicts),
+        "num_sources": num_sources,
+        "mean_probability": round(total_prob / len(claims), 4) if claims else None,
+        "summary": report.get("ex:summary", ""),
+        "conflicts": conflicts,
+    }
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def _unpack(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class ReportArchive:
+    """SQLite archive of JSON-LD reports with precomputed summaries and per-claim rows.
+
+    Safe to share between threads; SQLite's file locking makes it safe
+    to share between processes on one host.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ── Writing ──
+
+    def add(self, report: dict, created_at: float | None = None) -> int:
+        """Archive a report and return its id."""
+        summary = summarize_report(report)
+        blob = _pack(report)
+        now = time.time() if created_at is None else created_at
+        with self._lock, self._conn:
+            report_id = self._conn.execute(
+                "INSERT INTO reports (query, generated_at, created_at, num_claims, supported, contested,"
+                " refuted, num_conflicts, num_sources, mean_probability, summary, conflicts, size, report)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (summary["query"], summary["generated_at"], now, summary["num_claims"],
+                 summary["supported"], summary["contested"], summary["refuted"],
+                 summary["num_conflicts"], summary["num_sources"], summary["mean_probability"],
+                 summary["summary"], json.dumps(summary["conflicts"], ensure_ascii=False),
+                 len(blob), blob),
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO report_claims (report_id, position, verdict, probability, num_sources, claim)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(report_id, i, claim_verdict(claim_probability(c)), claim_probability(c),
+                  len(c.get("ex:sources", [])), _pack(c))
+                 for i, c in enumerate(report.get("ex:claims", []))],
+            )
+        return report_id
+
+    def delete(self, report_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reports WHERE id = ?", (report_id,))
+
+    # ── Reading ──
+
+    def _search_clause(self, search: str) -> tuple[str, tuple]:
+        if not search:
+            return "", ()
+        return " WHERE query LIKE ? ESCAPE '\\'", (
+            "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",)
+
+    def count(self, search: str = "") -> int:
+        where, params = self._search_clause(search)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM reports{where}", params).fetchone()[0]
+
+    def recent(self, offset: int = 0, limit: int = 20, search: str = "") -> list[dict[str, Any]]:
+        """Summaries of archived reports, newest first, optionally filtered by query text."""
+        where, params = self._search_clause(search)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM reports{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + (limit, offset),
+            )]
+
+    def summary(self, report_id: int) -> dict[str, Any] | None:
+        """One report's precomputed summary, including its conflicts."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS}, conflicts FROM reports WHERE id = ?", (report_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        out = dict(row)
+        out["conflicts"] = json.loads(out["conflicts"])
+        return out
+
+    def claims(self, report_id: int, offset: int = 0, limit: int = 20,
+               verdict: str | None = None) -> list[dict[str, Any]]:
+        """A page of a report's claims in report order, optionally only one verdict.
+
+        Each item is ``{"position", "verdict", "probability", "num_sources", "claim"}``.
+        """
+        sql = ("SELECT position, verdict, probability, num_sources, claim FROM report_claims"
+               " WHERE report_id = ?")
+        params: tuple = (report_id,)
+        if verdict:
+            sql += " AND verdict = ?"
+            params += (verdict,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY position LIMIT ? OFFSET ?",
+                                      params + (limit, offset)).fetchall()
+        return [{**dict(row), "claim": _unpack(row["claim"])} for row in rows]
+
+    def report(self, report_id: int) -> dict | None:
+        """The full archived JSON-LD report."""
+        with self._lock:
+            row = self._conn.execute("SELECT report FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return _unpack(row[0]) if row is not None else None
+
+    def version(self) -> tuple[int, int]:
+        """(report count, newest id): changes whenever a report is added or deleted."""
+        with self._lock:
+            count, newest = self._conn.execute("SELECT COUNT(*), MAX(id) FROM reports").fetchone()
+        return count, newest or 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            reports, claims = (self._conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                               for t in ("reports", "report_claims"))
+            size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+        return {"reports": reports, "claims": claims, "compressed_bytes": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def iter_claim_rows(report: dict, verdict: str | None = None) -> Iterator[dict[str, Any]]:
+    """``ReportArchive.claims`` items for an in-memory report (not yet archived)."""
+    for i, claim in enumerate(report.get("ex:claims", [])):
+        prob = claim_probability(claim)
+        v = claim_verdict(prob)
+        if verdict and v != verdict:
+            continue
+        yield {"position": i, "verdict": v, "probability": prob,
+               "num_sources": len(claim.get("ex:sources", [])), "claim": claim}
+
+
+_report_archive: ReportArchive | None = None
+_report_archive_lock = threading.Lock()
+
+
+def get_report_archive() -> ReportArchive | None:
+    """Return the shared report archive, opening it on first use (None if disabled)."""
+    global _report_archive
+    if _report_archive is None and REPORT_ARCHIVE_PATH:
+        with _report_archive_lock:
+            if _report_archive is None:
+                _report_archive = ReportArchive(REPORT_ARCHIVE_PATH)
+    return _report_archive
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Browse the TrustGraph report archive")
+    parser.add_argument("--db", default=REPORT_ARCHIVE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ls = sub.add_parser("list", help="Newest reports first")
+    ls.add_argument("--search", default="")
+    ls.add_argument("--limit", type=int, default=20)
+    ls.add_argument("--offset", type=int, default=0)
+    sub.add_parser("show", help="A report's summary").add_argument("report_id", type=int)
+    sub.add_parser("import", help="Archive JSON-LD report files").add_argument("paths", nargs="+")
+    sub.add_parser("stats", help="Row counts and size")
+    args = parser.parse_args()
+
+    archive = ReportArchive(args.db)
+    if args.command == "list":
+        result: Any = archive.recent(args.offset, args.limit, args.search)
+    elif args.command == "show":
+        result = archive.summary(args.report_id)
+    elif args.command == "import":
+        result = []
+        for path in args.paths:
+            with open(path, "r", encoding="utf-8") as f:
+                result.append({"path": path, "id": archive.add(json.load(f), os.path.getmtime(path))})
+    else:
+        result = archive.stats()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""TrustGraph relevance pre-ranking — pick and trim sources locally before LLM extraction.
+
+Search results come back in the search engine's order, with whatever
+content it returned. With re-ranking on, the agent over-fetches
+candidates for each claim, and this module, on CPU only:
+
+1. splits every candidate's content into passages of a few sentences;
+2. scores all passages against the claim with BM25 (stemmed content
+   words, the same tokenizer as tools/claim_index.py), using the claim's
+   candidate pool as the corpus;
+3. ranks candidates by their best passages and keeps the top ``keep``;
+4. replaces each kept candidate's content with its highest-scoring
+   passages that fit in ``token_budget`` tokens, in original order.
+
+Extraction prompts get shorter and the per-claim source slots go to the
+candidates that actually talk about the claim.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+
+from tools.claim_index import claim_words
+
+
+RERANK_POOL = int(os.environ.get("TRUSTGRAPH_RERANK_POOL", 10))
+PASSAGE_TOKENS = int(os.environ.get("TRUSTGRAPH_PASSAGE_TOKENS", 160))
+PASSAGE_WORDS = 50
+BM25_K1 = 1.5
+BM25_B = 0.75
+PASSAGE_JOINER = " … "  # between the passages kept from one page
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count: ~4/3 tokens per word."""
+    return math.ceil(len(text.split()) * 4 / 3)
+
+
+def split_passages(text: str, max_words: int = PASSAGE_WORDS) -> list[str]:
+    """Split text into passages of whole sentences, each at most ``max_words`` words.
+
+    Sentences longer than ``max_words`` are cut into word windows.
+    """
+    passages: list[str] = []
+    current: list[str] = []
+    count = 0
+    for sentence in _SENTENCE_END.split(text):
+        words = sentence.split()
+        if not words:
+            continue
+        if count and count + len(words) > max_words:
+            passages.append(" ".join(current))
+            current, count = [], 0
+        for start in range(0, len(words), max_words):
+            chunk = words[start:start + max_words]
+            if len(chunk) == max_words:
+                if current:
+                    passages.append(" ".join(current))
+                    current, count = [], 0
+                passages.append(" ".join(chunk))
+            else:
+                current.extend(chunk)
+                count += len(chunk)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+class BM25:
+    """Okapi BM25 over a small in-memory corpus of tokenized passages."""
+
+    def __init__(self, docs: list[list[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.tfs = [Counter(d) for d in docs]
+        self.lengths = [len(d) for d in docs]
+        self.avg_length = sum(self.lengths) / len(docs) if docs else 0.0
+        df = Counter(term for tf in self.tfs for term in tf)
+        n = len(docs)
+        self.idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def scores(self, query: list[str]) -> list[float]:
+        terms = [t for t in set(query) if t in self.idf]
+        out = []
+        for tf, length in zip(self.tfs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            out.append(sum(
+                self.idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm)
+                for t in terms if t in tf
+            ))
+        return out
+
+
+def rank_results(claim: str, results: list[dict], keep: int,
+                 token_budget: int = PASSAGE_TOKENS) -> list[dict]:
+    """Keep the ``keep`` results most relevant to ``claim``, trimmed to ``token_budget`` tokens each.
+
+    A result's score is the sum of its two best passage scores, so one
+    strong passage or two decent ones both count. Ties (including no
+    overlap at all) keep the search engine's order. Returned results are
+    copies with ``content`` trimmed and ``rank_score`` added.
+    ``token_budget <= 0`` keeps the full content.
+    """
+    passages: list[tuple[int, int, str]] = []  # (result index, position, text)
+    for ri, r in enumerate(results):
+        for pi, text in enumerate(split_passages(r.get("content", ""))):
+            passages.append((ri, pi, text))
+    bm25 = BM25([claim_words(text) for _, _, text in passages])
+    scores = bm25.scores(claim_words(claim))
+
+    by_result: dict[int, list[tuple[float, int, str]]] = {ri: [] for ri in range(len(results))}
+    for (ri, pi, text), score in zip(passages, scores):
+        by_result[ri].append((score, pi, text))
+
+    def result_score(ri: int) -> float:
+        best = sorted((s for s, _, _ in by_result[ri]), reverse=True)[:2]
+        return sum(best)
+
+    ranked = sorted(range(len(results)), key=lambda ri: -result_score(ri))[:keep]
+    out = []
+    for ri in ranked:
+        r = dict(results[ri])
+        r["rank_score"] = round(result_score(ri), 4)
+        if token_budget > 0 and by_result[ri]:
+            chosen, used = [], 0
+            for score, pi, text in sorted(by_result[ri], key=lambda p: (-p[0], p[1])):
+                cost = estimate_tokens(text)
+                if chosen and used + cost > token_budget:
+                    continue
+                chosen.append((pi, text))
+                used += cost
+            r["content"] = PASSAGE_JOINER.join(text for _, text in sorted(chosen))
+        out.append(r)
+    return out
+
+
+def merge_passages(contents: list[str]) -> str:
+    """One text for a page read on behalf of several claims.
+
+    Identical copies (no re-ranking) come back unchanged; otherwise every
+    passage kept for any of the claims appears once, in first-seen order.
+    """
+    distinct = list(dict.fromkeys(contents))
+    if len(distinct) == 1:
+        return distinct[0]
+    passages = dict.fromkeys(p for text in distinct for p in text.split(PASSAGE_JOINER))
+    return PASSAGE_JOINER.join(passages)
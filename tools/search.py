@@ -1,57 +1,175 @@
 """TrustGraph web search tool using Tavily."""
 
 import os
+import re
 import json
-from urllib.request import Request, urlopen
-from urllib.error import URLError
+import hashlib
+import threading
 from typing import Any
 
+from tools import quota, telemetry
+from tools.cache import DiskCache
+from tools.http_client import HTTPClient, HTTPClientError
+from tools.replay import through_cassette
+
 
 TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY", "")
-TAVILY_URL = "https://api.tavily.com/search"
+TAVILY_URL = os.environ.get("TAVILY_URL", "https://api.tavily.com/search")
+TAVILY_TIMEOUT = float(os.environ.get("TAVILY_TIMEOUT", 15))
+TAVILY_DEADLINE = float(os.environ.get("TAVILY_DEADLINE", 30))
+TAVILY_MAX_RETRIES = int(os.environ.get("TAVILY_MAX_RETRIES", 3))
+QUOTA_KEY = "tavily/search"  # entry in tools/quotas.json
+
+_tavily_client: HTTPClient | None = None
+_tavily_client_lock = threading.Lock()
+
+# Search result cache. Set TRUSTGRAPH_SEARCH_CACHE to an empty string to disable.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SEARCH_CACHE_PATH = os.environ.get(
+    "TRUSTGRAPH_SEARCH_CACHE", os.path.join(PROJECT_ROOT, ".cache", "search.sqlite3")
+)
+SEARCH_CACHE_TTL = float(os.environ.get("TRUSTGRAPH_SEARCH_CACHE_TTL", 7 * 24 * 3600))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("TRUSTGRAPH_SEARCH_CACHE_SIZE", 2000))
+
+_search_cache: DiskCache | None = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> DiskCache | None:
+    """Return the shared search cache, opening it on first use (None if disabled)."""
+    global _search_cache
+    if _search_cache is None and SEARCH_CACHE_PATH:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = DiskCache(
+                    SEARCH_CACHE_PATH,
+                    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+                    default_ttl=SEARCH_CACHE_TTL,
+                )
+    return _search_cache
+
+
+def get_tavily_client() -> HTTPClient:
+    """Return the shared keep-alive HTTP client used for Tavily requests."""
+    global _tavily_client
+    if _tavily_client is None:
+        with _tavily_client_lock:
+            if _tavily_client is None:
+                _tavily_client = HTTPClient(
+                    max_retries=TAVILY_MAX_RETRIES,
+                    timeout=TAVILY_TIMEOUT,
+                    deadline=TAVILY_DEADLINE,
+                )
+    return _tavily_client
 
 
-def web_search(query: str, max_results: int = 5) -> list[dict]:
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different phrasings share a cache entry.
+
+    Lowercases, collapses whitespace and strips surrounding quotes and
+    punctuation: '  "Remote work productivity?" ' -> 'remote work productivity'.
+    """
+    q = re.sub(r"\s+", " ", query.lower()).strip()
+    return q.strip(" \"'`.,;:!?")
+
+
+def search_cache_key(query: str, max_results: int, search_depth: str) -> str:
+    """Cache key for a search: hash of normalized query, max_results and depth."""
+    raw = json.dumps([normalize_query(query), max_results, search_depth])
+    return "search:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def web_search(query: str, max_results: int = 5, search_depth: str = "basic",
+               use_cache: bool = True, refresh: bool = False) -> list[dict]:
     """Search the web using Tavily and return structured results.
 
+    Results are served from the on-disk search cache when a fresh entry
+    exists. ``use_cache=False`` bypasses the cache entirely;
+    ``refresh=True`` skips the lookup but stores the new results.
+    Failed searches are never cached. Searches also go through the active
+    record/replay cassette (tools/replay.py).
+
     Returns list of dicts with: title, url, content, score
     """
+    with telemetry.span("web_search", "search"):
+        key = search_cache_key(query, max_results, search_depth)
+        return through_cassette("search", "web_search", key,
+                                lambda: _cached_search(key, query, max_results, search_depth,
+                                                       use_cache, refresh))
+
+
+def _cached_search(key: str, query: str, max_results: int, search_depth: str,
+                   use_cache: bool, refresh: bool) -> list[dict]:
+    cache = get_search_cache() if use_cache else None
+    if cache is not None and not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            telemetry.annotate(cache="hit")
+            return cached
+
+    telemetry.annotate(cache="miss" if cache is not None else "off")
+    results = _tavily_search(query, max_results, search_depth)
+    if results is None:
+        return []
+    if cache is not None:
+        cache.set(key, results)
+    return results
+
+
+async def web_search_async(query: str, max_results: int = 5, search_depth: str = "basic",
+                           use_cache: bool = True, refresh: bool = False) -> list[dict]:
+    """Async ``web_search`` for asyncio pipelines.
+
+    Runs on a worker thread over the shared keep-alive connection pool.
+    """
+    import asyncio
+
+    return await asyncio.to_thread(web_search, query, max_results, search_depth,
+                                   use_cache, refresh)
+
+
+def _tavily_search(query: str, max_results: int, search_depth: str) -> list[dict] | None:
+    """POST a query to Tavily over the pooled client. Returns None on failure."""
     if not TAVILY_API_KEY:
         print("[WARN] TAVILY_API_KEY not set, returning empty results");
-        return []
+        return None
 
-    payload = json.dumps({
+    payload = {
         "query": query,
         "max_results": max_results,
         "include_answer": False,
-        "search_depth": "basic",
-    }).encode("utf-8")
-
-    req = Request(
-        TAVILY_URL,
-        data=payload,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {TAVILY_API_KEY}",
-        },
-        method="POST",
-    )
+        "search_depth": search_depth,
+    }
 
     try:
-        with urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            results = []
-            for r in data.get("results", []):
-                results.append({
-                    "title": r.get("title", ""),
-                    "url": r.get("url", ""),
-                    "content": r.get("content", ""),
-                    "score": r.get("score", 0.0),
-                })
-            return results
-    except URLError as e:
-        print(f"[ERROR] Tavily search failed: {e}")
-        return []
+        waited = quota.acquire(QUOTA_KEY, cost=2 if search_depth == "advanced" else 1)
+    except quota.QuotaExhausted as e:
+        print(f"[WARN] {e}, returning empty results")
+        return None
+    if waited:
+        telemetry.annotate(quota_wait_s=round(waited, 3))
+
+    try:
+        data = get_tavily_client().post_json(
+            TAVILY_URL,
+            payload,
+            headers={"Authorization": f"Bearer {TAVILY_API_KEY}"},
+        )
+    except HTTPClientError as e:
+        if e.status == 429:
+            quota.penalize(QUOTA_KEY)
+        print(f"[ERROR] Tavily search failed (status={e.status}, attempts={e.attempts}): {e}")
+        return None
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
-        return []
+        return None
+
+    results = []
+    for r in data.get("results", []):
+        results.append({
+            "title": r.get("title", ""),
+            "url": r.get("url", ""),
+            "content": r.get("content", ""),
+            "score": r.get("score", 0.0),
+        })
+    return results
@@ -0,0 +1,166 @@
+"""TrustGraph source registry — one entry per distinct source within a run.
+
+Claims of one query often pull the same pages from ``web_search``, and
+syndicated copies of one article show up under different URLs. The
+registry recognizes both:
+
+- the same page: URLs are canonicalized (scheme, ``www.``, default port,
+  fragment, trailing slash and tracking parameters such as ``utm_*``
+  dropped; remaining parameters sorted), and content with an identical
+  word fingerprint is treated as the same page;
+- near-copies: word 4-gram shingles are MinHashed and probed through
+  in-memory LSH buckets, and a candidate with shingle Jaccard at or above
+  ``threshold`` joins the earlier source's duplicate group.
+
+Every registration returns a ``SourceEntry``. Entries of the same page
+share a ``key`` and the content first fetched for it. Near-copies keep
+their own key but share a ``group``, which ``fuse_evidence`` uses to
+count them as one piece of evidence.
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from tools.claim_index import jaccard, lsh_buckets, minhash
+
+
+SOURCE_DUP_THRESHOLD = float(os.environ.get("TRUSTGRAPH_SOURCE_DUP_THRESHOLD", 0.7))
+SHINGLE_WORDS = 4
+MIN_SHINGLES = 8  # shorter snippets are only matched exactly
+
+_TRACKING_PARAMS = frozenset((
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "cmpid", "src", "share", "spm",
+))
+
+
+def canonical_url(url: str) -> str:
+    """Scheme-less canonical form of a URL used as the source key."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return host + path + (f"?{urlencode(query)}" if query else "")
+
+
+def content_words(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def content_fingerprint(words: list[str]) -> str:
+    """Exact-duplicate fingerprint: a hash of the normalized words."""
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()[:16]
+
+
+def content_shingles(words: list[str]) -> set[str]:
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+@dataclass
+class SourceEntry:
+    """A registered search result.
+
+    ``key`` identifies the page (canonical URL, or the first URL seen with
+    identical content); ``group`` is shared by near-copies of one article;
+    ``duplicate_of`` is the key of the group's first page when this page is
+    a near-copy of it, else None.
+    """
+
+    key: str
+    url: str
+    title: str
+    content: str
+    group: int
+    fingerprint: str
+    duplicate_of: str | None = None
+    uses: int = 0  # search results that resolved to this entry
+
+
+class SourceRegistry:
+    """Per-run registry of search results keyed by canonical URL and content fingerprint."""
+
+    def __init__(self, threshold: float = SOURCE_DUP_THRESHOLD):
+        self.threshold = threshold
+        self.entries: dict[str, SourceEntry] = {}
+        self.registrations = 0
+        self._by_fingerprint: dict[str, str] = {}
+        self._shingles: dict[str, set[str]] = {}
+        self._buckets: dict[tuple[int, int], list[str]] = {}
+        self._groups = 0
+
+    def register(self, result: dict) -> SourceEntry:
+        """Register one ``web_search`` result and return its entry."""
+        self.registrations += 1
+        key = canonical_url(result.get("url", ""))
+        entry = self.entries.get(key)
+        if entry is None:
+            words = content_words(result.get("content", ""))
+            fingerprint = content_fingerprint(words)
+            same = self._by_fingerprint.get(fingerprint) if words else None
+            if same is not None:
+                entry = self.entries[same]
+            else:
+                entry = self._add(key, result, words, fingerprint)
+        entry.uses += 1
+        return entry
+
+    def _add(self, key: str, result: dict, words: list[str], fingerprint: str) -> SourceEntry:
+        shingles = content_shingles(words)
+        near = self._near_duplicate(shingles) if len(shingles) >= MIN_SHINGLES else None
+        if near is None:
+            self._groups += 1
+            group, duplicate_of = self._groups, None
+        else:
+            group, duplicate_of = self.entries[near].group, self.entries[near].key
+        entry = SourceEntry(
+            key=key,
+            url=result.get("url", ""),
+            title=result.get("title", ""),
+            content=result.get("content", ""),
+            group=group,
+            fingerprint=fingerprint,
+            duplicate_of=duplicate_of,
+        )
+        self.entries[key] = entry
+        if words:
+            self._by_fingerprint[fingerprint] = key
+        if len(shingles) >= MIN_SHINGLES:
+            self._shingles[key] = shingles
+            for band_bucket in enumerate(lsh_buckets(minhash(shingles))):
+                self._buckets.setdefault(band_bucket, []).append(key)
+        return entry
+
+    def _near_duplicate(self, shingles: set[str]) -> str | None:
+        """Key of the most similar registered page at or above threshold, if any."""
+        candidates = {
+            key
+            for band_bucket in enumerate(lsh_buckets(minhash(shingles)))
+            for key in self._buckets.get(band_bucket, ())
+        }
+        best, best_score = None, self.threshold
+        for key in candidates:
+            score = jaccard(shingles, self._shingles[key])
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def stats(self) -> dict:
+        return {
+            "registered": self.registrations,
+            "unique": len(self.entries),
+            "near_duplicates": sum(1 for e in self.entries.values() if e.duplicate_of),
+            "groups": len({e.group for e in self.entries.values()}),
+            "reused": sum(1 for e in self.entries.values() if e.uses > 1),
+        }
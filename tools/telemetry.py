@@ -0,0 +1,330 @@
+"""TrustGraph telemetry — spans, call counters and token accounting for the hot paths.
+
+Every LLM call (via ``llm_cached``), every ``web_search`` and the
+confidence-algebra fusion functions open a span recording wall time,
+cache outcome, retries, prompt/completion tokens and errors. Spans are
+scoped to query → claim → source through context variables; ``fan_out``
+carries the scope into its worker threads.
+
+Tracing is off unless enabled. Set any of these, or call ``enable()``:
+
+    TRUSTGRAPH_TRACE=trace.json       JSON trace of the last run (spans + summary)
+    TRUSTGRAPH_METRICS=metrics.prom   Prometheus text snapshot (cumulative counters)
+    TRUSTGRAPH_TRACE_IN_REPORT=1      embed the summary in the report's prov:Activity
+
+When disabled, ``span`` returns a shared no-op context manager and
+``traced`` functions pay one global lookup per call.
+
+Token counts come from litellm's success callback. It can fire on another
+thread after the call returns, so usage is matched to the LLM span whose
+time window contains the litellm call. When concurrent spans overlap and
+the match is ambiguous, the tokens count toward the run totals only.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+
+TRACE_PATH = os.environ.get("TRUSTGRAPH_TRACE", "")
+METRICS_PATH = os.environ.get("TRUSTGRAPH_METRICS", "")
+TRACE_IN_REPORT = os.environ.get("TRUSTGRAPH_TRACE_IN_REPORT", "").lower() in ("1", "true", "yes")
+
+_scope: contextvars.ContextVar[dict] = contextvars.ContextVar("trustgraph_scope", default={})
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("trustgraph_span", default=None)
+_NOOP = contextlib.nullcontext()
+
+
+class Span:
+    """One timed call. Fields other than name/kind/scope are filled in as the call runs."""
+
+    __slots__ = ("name", "kind", "scope", "start", "end", "attrs")
+
+    def __init__(self, name: str, kind: str, scope: dict):
+        self.name = name
+        self.kind = kind
+        self.scope = scope
+        self.start = time.time()
+        self.end: float | None = None
+        self.attrs: dict[str, Any] = {}
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.time()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "scope": self.scope,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            **self.attrs,
+        }
+
+
+class Tracer:
+    """Collects spans for the current run and cumulative per-call counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.run_started = time.time()
+        self.spans: list[Span] = []
+        self.unattributed_tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+        self._recent_llm: deque[Span] = deque(maxlen=256)
+        # (name, kind) -> counters; never reset, for Prometheus
+        self.counters: dict[tuple[str, str], dict[str, float]] = {}
+
+    def begin_run(self) -> None:
+        """Start a new trace. Cumulative counters carry on."""
+        with self._lock:
+            self.run_started = time.time()
+            self.spans = []
+            self.unattributed_tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+            self._recent_llm.clear()
+
+    def _finish(self, span: Span) -> None:
+        span.end = time.time()
+        with self._lock:
+            self.spans.append(span)
+            c = self.counters.setdefault((span.name, span.kind), {
+                "calls": 0, "seconds": 0.0, "errors": 0, "retries": 0,
+                "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            })
+            c["calls"] += 1
+            c["seconds"] += span.duration_ms / 1000
+            c["errors"] += 1 if "error" in span.attrs else 0
+            c["retries"] += span.attrs.get("retries", 0)
+            c["cache_hits"] += 1 if span.attrs.get("cache") in ("hit", "replay") else 0
+            c["prompt_tokens"] += span.attrs.get("prompt_tokens", 0)
+            c["completion_tokens"] += span.attrs.get("completion_tokens", 0)
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: str):
+        s = Span(name, kind, _scope.get())
+        if kind == "llm":
+            with self._lock:
+                self._recent_llm.append(s)
+        token = _current.set(s)
+        try:
+            yield s
+        except BaseException as e:
+            s.attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(s)
+
+    def record_usage(self, start: float, end: float, prompt_tokens: int,
+                     completion_tokens: int) -> None:
+        """Attribute one litellm call's token usage to the LLM span that contains it."""
+        with self._lock:
+            candidates = sorted(
+                (s for s in self._recent_llm
+                 if s.start <= start + 0.001 and (s.end is None or end <= s.end + 0.001)),
+                key=lambda s: s.start,
+            )
+            # Nested LLM spans (one LLM function calling another) resolve to the innermost
+            inner = candidates[-1] if candidates else None
+            if inner is not None and all(
+                c.start <= inner.start and (c.end is None or (inner.end is not None and inner.end <= c.end))
+                for c in candidates[:-1]
+            ):
+                target = inner.attrs
+                counters = self.counters.get((inner.name, "llm"))
+                if counters is not None and inner.end is not None:
+                    # Span already closed: fold into its counters too
+                    counters["prompt_tokens"] += prompt_tokens
+                    counters["completion_tokens"] += completion_tokens
+            else:
+                target = self.unattributed_tokens
+            target["prompt_tokens"] = target.get("prompt_tokens", 0) + prompt_tokens
+            target["completion_tokens"] = target.get("completion_tokens", 0) + completion_tokens
+
+    # ── Export ──
+
+    def summary(self) -> dict:
+        """Per-call and per-claim aggregates for the current run."""
+        with self._lock:
+            spans = list(self.spans)
+            unattributed = dict(self.unattributed_tokens)
+        by_call: dict[str, dict] = {}
+        by_claim: dict[str, dict] = {}
+        for s in spans:
+            for table, key in ((by_call, s.name), (by_claim, str(s.scope.get("claim", "-")))):
+                agg = table.setdefault(key, {"calls": 0, "total_ms": 0.0, "cache_hits": 0,
+                                             "retries": 0, "errors": 0,
+                                             "prompt_tokens": 0, "completion_tokens": 0})
+                agg["calls"] += 1
+                agg["total_ms"] += s.duration_ms
+                agg["cache_hits"] += 1 if s.attrs.get("cache") in ("hit", "replay") else 0
+                agg["retries"] += s.attrs.get("retries", 0)
+                agg["errors"] += 1 if "error" in s.attrs else 0
+                agg["prompt_tokens"] += s.attrs.get("prompt_tokens", 0)
+                agg["completion_tokens"] += s.attrs.get("completion_tokens", 0)
+        for table in (by_call, by_claim):
+            for agg in table.values():
+                agg["total_ms"] = round(agg["total_ms"], 3)
+        total_tokens = {
+            k: sum(a[k] for a in by_call.values()) + unattributed[k]
+            for k in ("prompt_tokens", "completion_tokens")
+        }
+        return {
+            "spans": len(spans),
+            "wall_ms": round((time.time() - self.run_started) * 1000, 1),
+            "tokens": total_tokens,
+            "unattributed_tokens": unattributed,
+            "by_call": by_call,
+            "by_claim": by_claim,
+        }
+
+    def trace(self) -> dict:
+        """The full JSON trace of the current run."""
+        with self._lock:
+            spans = [s.to_dict(self.run_started) for s in self.spans]
+        return {"run_started": self.run_started, "spans": spans, "summary": self.summary()}
+
+    def prometheus_text(self) -> str:
+        """Cumulative counters in the Prometheus text exposition format."""
+        metrics = [
+            ("trustgraph_calls_total", "counter", "Instrumented calls", "calls"),
+            ("trustgraph_call_seconds_total", "counter", "Wall time spent in calls", "seconds"),
+            ("trustgraph_call_errors_total", "counter", "Calls that raised", "errors"),
+            ("trustgraph_call_retries_total", "counter", "HTTP retries made inside calls", "retries"),
+            ("trustgraph_cache_hits_total", "counter", "Calls served from a cache or cassette", "cache_hits"),
+            ("trustgraph_prompt_tokens_total", "counter", "LLM prompt tokens", "prompt_tokens"),
+            ("trustgraph_completion_tokens_total", "counter", "LLM completion tokens", "completion_tokens"),
+        ]
+        with self._lock:
+            counters = {k: dict(v) for k, v in self.counters.items()}
+        lines = []
+        for metric, mtype, help_text, field in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {mtype}")
+            for (name, kind), c in sorted(counters.items()):
+                lines.append(f'{metric}{{name="{name}",kind="{kind}"}} {c[field]:g}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, trace_path: str = "", metrics_path: str = "") -> None:
+        """Write the JSON trace and/or Prometheus snapshot, if paths are given."""
+        if trace_path:
+            with open(trace_path, "w", encoding="utf-8") as f:
+                json.dump(self.trace(), f, indent=1, default=str)
+        if metrics_path:
+            with open(metrics_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+
+
+_tracer: Tracer | None = None
+
+
+def enable() -> Tracer:
+    """Turn tracing on for this process and hook litellm's usage callback."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+        _register_litellm_callback()
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def get_tracer() -> Tracer | None:
+    """The active tracer, or None when tracing is off."""
+    return _tracer
+
+
+def span(name: str, kind: str = "call"):
+    """Context manager timing one call; a shared no-op when tracing is off."""
+    if _tracer is None:
+        return _NOOP
+    return _tracer.span(name, kind)
+
+
+def annotate(**attrs: Any) -> None:
+    """Set attributes on the innermost open span (no-op when tracing is off)."""
+    if _tracer is None:
+        return
+    s = _current.get()
+    if s is not None:
+        s.attrs.update(attrs)
+
+
+def add_retry() -> None:
+    """Count one retry against the innermost open span."""
+    if _tracer is None:
+        return
+    s = _current.get()
+    if s is not None:
+        s.attrs["retries"] = s.attrs.get("retries", 0) + 1
+
+
+def traced(kind: str) -> Callable:
+    """Decorator opening a span named after the function on every call."""
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(name, kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+# ── Scopes ──
+
+def current_scope() -> dict:
+    return _scope.get()
+
+
+@contextlib.contextmanager
+def scope(**fields: Any):
+    """Nest query/claim/source identifiers for spans opened inside the block."""
+    token = _scope.set({**_scope.get(), **fields})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+# ── litellm token usage ──
+
+def _usage_callback(kwargs, completion_response, start_time, end_time) -> None:
+    tracer = _tracer
+    usage = getattr(completion_response, "usage", None)
+    if tracer is None or usage is None:
+        return
+    def ts(value) -> float:
+        return value.timestamp() if hasattr(value, "timestamp") else float(value)
+    tracer.record_usage(ts(start_time), ts(end_time),
+                        int(getattr(usage, "prompt_tokens", 0) or 0),
+                        int(getattr(usage, "completion_tokens", 0) or 0))
+
+
+def _register_litellm_callback() -> None:
+    try:
+        import litellm
+    except ImportError:
+        return
+    callbacks = getattr(litellm, "success_callback", None)
+    if isinstance(callbacks, list) and _usage_callback not in callbacks:
+        callbacks.append(_usage_callback)
+
+
+if TRACE_PATH or METRICS_PATH or TRACE_IN_REPORT:
+    enable()
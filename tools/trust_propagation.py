@@ -0,0 +1,493 @@
+"""TrustGraph trust propagation — source trust learned from the stored run graph.
+
+``apply_trust_discount`` discounts each piece of evidence by one trust
+scalar. By default that scalar is the source's domain rating
+(tools/trust_domains.json). This module derives it from the graph in
+``tools/graph_store.py`` instead, across every stored run.
+
+The source-to-source graph: every stored Evidence node is DerivedFrom a
+Source and belongs to a Claim. Two sources that gave evidence on the same
+claim text (across all runs) are linked:
+
+    agree       both supported, or both contradicted, the claim
+    disagree    one supported it, the other contradicted it
+    DuplicateOf one is a near-copy of the other (counts as agreement)
+
+The counts are held in a symmetric sparse matrix built with SciPy from
+the claim-by-source stance incidence matrix M (+1 supports, -1
+contradicts): ``M.T @ M`` gives agreements minus disagreements and
+``|M|.T @ |M|`` all co-occurrences.
+
+Each source i holds a Subjective Logic trust opinion, kept as evidence
+counts (r_i, s_i) with base rate a_i = its domain rating. The rating is
+also ``PRIOR_WEIGHT`` units of prior evidence, so a source with no links
+keeps exactly its domain rating. Each link gives an edge opinion ω_ij from
+its counts. Trust is the fixed point of
+
+    ω_i = prior_i ⊕ ⨁_j (ω_j ⊗ ω_ij)
+
+Here ⊗ is Jøsang's trust discount and ⊕ is cumulative fusion, which adds
+evidence counts. Agreeing with trusted sources raises trust, and
+contradicting them lowers it. Links to untrusted sources carry little
+weight either way. The source's trust score is the projected
+probability P = (r + 2a) / (r + s + 2).
+
+Iteration is Jacobi-style and fully vectorized over the CSR edge arrays.
+After the first pass, only sources with a changed neighbour are
+recomputed. ``update()`` reads only the evidence added since the last
+update. It adjusts the edge counts for the claim texts that evidence
+touches, then re-propagates from the affected sources, warm-started
+from the stored fixed point.
+
+State is one ``.npz`` file (link counts as upper-triangle COO arrays,
+evidence counts per source), replaced atomically under a lock file.
+Indexes are graph store source ids.
+
+    python -m tools.trust_propagation build     # full rebuild
+    python -m tools.trust_propagation update    # fold in new runs
+    python -m tools.trust_propagation lookup https://www.nature.com/articles/...
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+import numpy as np
+import scipy.sparse as sp
+
+from tools.graph_store import GraphStore, get_graph_store
+from tools.source_registry import canonical_url
+from tools.trust_registry import score_source_url
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Set TRUSTGRAPH_TRUST_PROPAGATION to an empty string to disable.
+TRUST_PROPAGATION_PATH = os.environ.get(
+    "TRUSTGRAPH_TRUST_PROPAGATION", os.path.join(PROJECT_ROOT, ".cache", "trust.npz")
+)
+PRIOR_WEIGHT = float(os.environ.get("TRUSTGRAPH_TRUST_PRIOR_WEIGHT", 4.0))
+DUPLICATE_WEIGHT = 2.0  # agreement units for a DuplicateOf link
+TOLERANCE = 1e-5
+FULL_SWEEP_FRACTION = 8  # frontiers over 1/8 of all sources get a full sweep
+MAX_ITERATIONS = 100
+STATE_VERSION = 1
+
+W = 2.0  # Subjective Logic non-informative prior weight
+
+
+# ── Sparse graph construction ──
+
+def stance_edges(text_ids: np.ndarray, source_ids: np.ndarray, supports: np.ndarray,
+                 num_sources: int) -> tuple[sp.csr_matrix, sp.csr_matrix]:
+    """Agreement and disagreement counts between sources from claim stances.
+
+    Each (claim text, source) pair counts once, however many runs repeated
+    it. A source that both supported and contradicted a claim text is
+    left out for that text. Returns two symmetric ``num_sources`` square
+    CSR matrices with empty diagonals.
+    """
+    if len(text_ids) == 0:
+        empty = sp.csr_matrix((num_sources, num_sources))
+        return empty, empty.copy()
+    stance = np.where(np.asarray(supports) > 0, 1.0, -1.0)
+    incidence = sp.csr_matrix((stance, (text_ids, source_ids)),
+                              shape=(int(text_ids.max()) + 1, num_sources))
+    incidence.sum_duplicates()
+    incidence.data = np.sign(incidence.data)
+    incidence.eliminate_zeros()
+    present = incidence.copy()
+    present.data = np.abs(present.data)
+
+    net = (incidence.T @ incidence).tocsr()  # agree - disagree
+    total = (present.T @ present).tocsr()    # agree + disagree
+    agree = _drop_diagonal((total + net) * 0.5)
+    disagree = _drop_diagonal((total - net) * 0.5)
+    return agree, disagree
+
+
+def _drop_diagonal(m: sp.csr_matrix) -> sp.csr_matrix:
+    """``m`` without its diagonal or any zero entries (cheaper than ``setdiag(0)``)."""
+    m = m.tocsr()
+    rows = np.repeat(np.arange(m.shape[0]), np.diff(m.indptr))
+    m.data[rows == m.indices] = 0
+    m.eliminate_zeros()
+    return m
+
+
+def duplicate_edges(links: list[tuple[int, int]], num_sources: int,
+                    weight: float = DUPLICATE_WEIGHT) -> sp.csr_matrix:
+    """Symmetric agreement matrix with ``weight`` for every DuplicateOf link."""
+    if not links:
+        return sp.csr_matrix((num_sources, num_sources))
+    pairs = np.asarray(links, dtype=np.int64)
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    m = sp.csr_matrix((np.full(len(rows), weight), (rows, cols)), shape=(num_sources, num_sources))
+    m.data[:] = weight  # repeated links count once
+    return m
+
+
+def edge_arrays(agree: sp.csr_matrix, disagree: sp.csr_matrix) -> tuple[np.ndarray, ...]:
+    """Merge the two count matrices onto one CSR pattern: (indptr, indices, r, s)."""
+    # One complex matrix keeps both counts aligned on the union of their patterns
+    merged = (agree + disagree * complex(0, 1)).tocsr()
+    merged.sum_duplicates()
+    return (merged.indptr.astype(np.int64), merged.indices.astype(np.int32),
+            merged.data.real.copy(), merged.data.imag.copy())
+
+
+# ── Propagation ──
+
+def _row_positions(indptr: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """CSR data positions of ``rows``, and for each position its index into ``rows``."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return starts[owner] + offsets, owner
+
+
+def propagate(indptr: np.ndarray, indices: np.ndarray, edge_r: np.ndarray, edge_s: np.ndarray,
+              prior_r: np.ndarray, prior_s: np.ndarray, r: np.ndarray, s: np.ndarray,
+              frontier: np.ndarray | None = None, tol: float = TOLERANCE,
+              max_iter: int = MAX_ITERATIONS) -> dict[str, Any]:
+    """Iterate trust discount + cumulative fusion to a fixed point, in place on ``r`` / ``s``.
+
+    ``r`` / ``s`` are the starting evidence counts (the previous fixed
+    point for a warm start). Only ``frontier`` sources are recomputed at
+    first (all of them if None); afterwards only neighbours of sources
+    whose belief moved by more than ``tol``.
+    """
+    n = len(prior_r)
+    edge_total = edge_r + edge_s + W
+    edge_b = edge_r / edge_total
+    edge_d = edge_s / edge_total
+    edge_c = edge_b + edge_d
+    # Full sweeps are one SpMV per count over fixed CSR patterns
+    sum_r = sp.csr_matrix((np.empty(len(indices)), indices, indptr), shape=(n, n))
+    sum_s = sp.csr_matrix((np.empty(len(indices)), indices, indptr), shape=(n, n))
+    ones = np.ones(n)
+    if frontier is None:
+        active = np.arange(n)
+    else:
+        active = np.asarray(frontier, dtype=np.int64)
+        active = np.flatnonzero(np.bincount(active[active < n], minlength=n))
+
+    iterations = updated = 0
+    while active.size and iterations < max_iter:
+        iterations += 1
+        belief = r / (r + s + W)
+        if active.size * FULL_SWEEP_FRACTION >= n:
+            # Most sources are due anyway: recompute all of them
+            active = np.arange(n)
+            bj = belief[indices]
+            # ω_j ⊗ ω_ij: b = b_j b_e, d = b_j d_e, u = 1 - b - d; evidence = W b / u, W d / u
+            scale = W * bj / (1.0 - bj * edge_c)
+            np.multiply(scale, edge_b, out=sum_r.data)
+            np.multiply(scale, edge_d, out=sum_s.data)
+            new_r = prior_r + sum_r @ ones
+            new_s = prior_s + sum_s @ ones
+        else:
+            pos, owner = _row_positions(indptr, active)
+            bj = belief[indices[pos]]
+            scale = W * bj / (1.0 - bj * edge_c[pos])
+            new_r = prior_r[active] + np.bincount(owner, weights=scale * edge_b[pos], minlength=len(active))
+            new_s = prior_s[active] + np.bincount(owner, weights=scale * edge_d[pos], minlength=len(active))
+        moved = np.abs(new_r / (new_r + new_s + W) - belief[active]) > tol
+        r[active] = new_r
+        s[active] = new_s
+        updated += len(active)
+        changed = active[moved]
+        if not changed.size:
+            active = changed
+            break
+        # Next round: every neighbour of a source that moved
+        mark = np.zeros(n, dtype=bool)
+        if changed.size * FULL_SWEEP_FRACTION >= n:
+            mark[:] = True
+        else:
+            mark[indices[_row_positions(indptr, changed)[0]]] = True
+        active = np.flatnonzero(mark)
+
+    return {"iterations": iterations, "updated": updated, "converged": not active.size}
+
+
+# ── Engine ──
+
+class TrustPropagation:
+    """Persistent propagated source trust over a graph store's sources."""
+
+    def __init__(self, path: str, graph_store: GraphStore, prior_weight: float = PRIOR_WEIGHT):
+        self.path = path
+        self.graph_store = graph_store
+        self.prior_weight = prior_weight
+        self._lock = threading.Lock()
+        self._mtime = 0.0
+        self.state = self._empty_state()
+        self.refresh()
+
+    @staticmethod
+    def _empty_state() -> dict[str, np.ndarray]:
+        return {
+            "version": np.array(STATE_VERSION),
+            "evidence_mark": np.array(0), "source_mark": np.array(0),
+            "base_rate": np.zeros(1), "r": np.zeros(1), "s": np.zeros(1),
+            "agree": np.zeros(0, np.float32), "agree_rows": np.zeros(0, np.int32), "agree_cols": np.zeros(0, np.int32),
+            "disagree": np.zeros(0, np.float32), "disagree_rows": np.zeros(0, np.int32),
+            "disagree_cols": np.zeros(0, np.int32),
+            "duplicates": np.zeros((0, 2), np.int64),
+        }
+
+    # ── Persistence ──
+
+    def refresh(self) -> None:
+        """Reload the state file if another process has replaced it."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        with np.load(self.path) as data:
+            state = {name: data[name] for name in data.files}
+        if int(state["version"]) != STATE_VERSION:
+            raise ValueError(f"unsupported trust state version {int(state['version'])} in {self.path}")
+        with self._lock:
+            self.state, self._mtime = state, mtime
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, **self.state)
+        os.replace(tmp, self.path)
+        self._mtime = os.stat(self.path).st_mtime
+
+    @contextlib.contextmanager
+    def _writer(self) -> Iterator[None]:
+        """Hold the in-process and cross-process locks around a state update."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _matrix(state: dict, name: str, n: int) -> sp.csr_matrix:
+        # Stored as the upper triangle; links are symmetric
+        upper = sp.csr_matrix((state[name].astype(np.float64), (state[name + "_rows"], state[name + "_cols"])),
+                              shape=(n, n))
+        return (upper + upper.T).tocsr()
+
+    @staticmethod
+    def _store_matrix(state: dict, name: str, m: sp.csr_matrix) -> None:
+        upper = sp.triu(m, k=1).tocoo()
+        state[name] = upper.data.astype(np.float32)
+        state[name + "_rows"] = upper.row.astype(np.int32)
+        state[name + "_cols"] = upper.col.astype(np.int32)
+
+    # ── Building ──
+
+    def _grow(self, state: dict, sources: list[tuple[int, str]]) -> np.ndarray:
+        """Add priors for new sources; returns their ids."""
+        if not sources:
+            return np.zeros(0, np.int64)
+        ids = np.array([sid for sid, _ in sources], dtype=np.int64)
+        n = max(len(state["base_rate"]), int(ids.max()) + 1)
+        for name in ("base_rate", "r", "s"):
+            grown = np.zeros(n)
+            grown[:len(state[name])] = state[name]
+            state[name] = grown
+        rating = np.array([score_source_url(url) for _, url in sources])
+        state["base_rate"][ids] = rating
+        state["r"][ids] = self.prior_weight * rating
+        state["s"][ids] = self.prior_weight * (1.0 - rating)
+        state["source_mark"] = np.array(max(int(state["source_mark"]), int(ids.max())))
+        return ids
+
+    @staticmethod
+    def _stance_arrays(rows: list[tuple[int, str, int, int]]) -> tuple[np.ndarray, ...]:
+        if not rows:
+            empty = np.zeros(0, np.int64)
+            return empty, empty, empty, empty
+        evidence_ids, hashes, source_ids, supports = zip(*rows)
+        _, text_ids = np.unique(np.array(hashes), return_inverse=True)
+        return (np.array(evidence_ids, np.int64), text_ids.astype(np.int64),
+                np.array(source_ids, np.int64), np.array(supports, np.int64))
+
+    def _propagate(self, state: dict, frontier: np.ndarray | None) -> dict[str, Any]:
+        n = len(state["base_rate"])
+        agree = self._matrix(state, "agree", n)
+        disagree = self._matrix(state, "disagree", n)
+        dup_links = [tuple(pair) for pair in state["duplicates"].tolist()]
+        indptr, indices, edge_r, edge_s = edge_arrays(agree + duplicate_edges(dup_links, n), disagree)
+        prior_r = self.prior_weight * state["base_rate"]
+        prior_s = self.prior_weight * (1.0 - state["base_rate"])
+        return propagate(indptr, indices, edge_r, edge_s, prior_r, prior_s,
+                         state["r"], state["s"], frontier)
+
+    def build(self) -> dict[str, Any]:
+        """Rebuild every edge from the graph store and propagate from the priors."""
+        started = time.perf_counter()
+        with self._writer():
+            state = self._empty_state()
+            self._grow(state, self.graph_store.sources_since(0))
+            n = len(state["base_rate"])
+            evidence_ids, text_ids, source_ids, supports = self._stance_arrays(self.graph_store.evidence_stances(0))
+            agree, disagree = stance_edges(text_ids, source_ids, supports, n)
+            self._store_matrix(state, "agree", agree)
+            self._store_matrix(state, "disagree", disagree)
+            state["duplicates"] = np.array(self.graph_store.duplicate_links(), dtype=np.int64).reshape(-1, 2)
+            state["evidence_mark"] = np.array(int(evidence_ids.max()) if len(evidence_ids) else 0)
+            result = self._propagate(state, None)
+            self.state = state
+            self._save()
+        return {**result, "sources": int(n - 1), "links": int(len(state["agree"]) + len(state["disagree"])),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def update(self) -> dict[str, Any]:
+        """Fold in runs recorded since the last build/update and re-propagate locally."""
+        started = time.perf_counter()
+        with self._writer():
+            state = dict(self.state)
+            state["r"], state["s"] = state["r"].copy(), state["s"].copy()
+            new_sources = self._grow(state, self.graph_store.sources_since(int(state["source_mark"])))
+            n = len(state["base_rate"])
+
+            new_rows = self.graph_store.evidence_stances(int(state["evidence_mark"]))
+            touched = [new_sources]
+            agree = self._matrix(state, "agree", n)
+            disagree = self._matrix(state, "disagree", n)
+            if new_rows:
+                # Recount the touched claim texts with and without the new evidence
+                mark = int(state["evidence_mark"])
+                hashes = sorted({h for _, h, _, _ in new_rows})
+                evidence_ids, text_ids, source_ids, supports = self._stance_arrays(
+                    self.graph_store.evidence_stances(text_hashes=hashes))
+                old = evidence_ids <= mark
+                agree_all, disagree_all = stance_edges(text_ids, source_ids, supports, n)
+                agree_old, disagree_old = stance_edges(text_ids[old], source_ids[old], supports[old], n)
+                delta = (abs(agree_all - agree_old) + abs(disagree_all - disagree_old)).tocoo()
+                agree = (agree + agree_all - agree_old).tocsr()
+                disagree = (disagree + disagree_all - disagree_old).tocsr()
+                agree.eliminate_zeros()
+                disagree.eliminate_zeros()
+                touched.append(delta.row[delta.data > 0])
+                state["evidence_mark"] = np.array(max(evidence_ids.max(), max(r[0] for r in new_rows)))
+            self._store_matrix(state, "agree", agree)
+            self._store_matrix(state, "disagree", disagree)
+
+            duplicates = np.array(self.graph_store.duplicate_links(), dtype=np.int64).reshape(-1, 2)
+            old_pairs = {tuple(p) for p in state["duplicates"].tolist()}
+            new_pairs = {tuple(p) for p in duplicates.tolist()}
+            changed_pairs = old_pairs ^ new_pairs
+            if changed_pairs:
+                touched.append(np.array(sorted(changed_pairs), dtype=np.int64).reshape(-1))
+            state["duplicates"] = duplicates
+
+            frontier = np.unique(np.concatenate(touched)) if any(len(t) for t in touched) else np.zeros(0, np.int64)
+            result = self._propagate(state, frontier) if len(frontier) else \
+                {"iterations": 0, "updated": 0, "converged": True}
+            self.state = state
+            self._save()
+        return {**result, "new_sources": int(len(new_sources)), "new_evidence": len(new_rows),
+                "touched": int(len(frontier)),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    # ── Reading ──
+
+    def opinions(self, ids) -> np.ndarray:
+        """(n, 4) trust opinions (belief, disbelief, uncertainty, base_rate) for source ids."""
+        ids = np.asarray(ids, dtype=np.int64)
+        with self._lock:
+            r, s, a = self.state["r"][ids], self.state["s"][ids], self.state["base_rate"][ids]
+        total = r + s + W
+        return np.stack([r / total, s / total, W / total, a], axis=1)
+
+    def trust(self, ids) -> np.ndarray:
+        """Propagated trust scores: projected probability b + a u of each trust opinion."""
+        ops = self.opinions(ids)
+        return ops[:, 0] + ops[:, 3] * ops[:, 2]
+
+    def trust_for_keys(self, keys: list[str]) -> dict[str, float]:
+        """Canonical source key -> propagated trust, for sources already propagated."""
+        ids = self.graph_store.source_ids(keys)
+        with self._lock:
+            known = int(self.state["source_mark"])
+        ids = {key: sid for key, sid in ids.items() if sid <= known}
+        if not ids:
+            return {}
+        scores = self.trust(list(ids.values()))
+        return {key: round(float(score), 4) for key, score in zip(ids, scores)}
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            state = self.state
+            return {
+                "sources": int(state["source_mark"]),
+                "agree_links": int(len(state["agree"])),
+                "disagree_links": int(len(state["disagree"])),
+                "duplicate_links": int(len(state["duplicates"])),
+                "evidence_mark": int(state["evidence_mark"]),
+            }
+
+
+_propagation: TrustPropagation | None = None
+_propagation_lock = threading.Lock()
+
+
+def get_trust_propagation() -> TrustPropagation | None:
+    """Return the shared propagation engine, loading it on first use (None if disabled)."""
+    global _propagation
+    if _propagation is None and TRUST_PROPAGATION_PATH:
+        with _propagation_lock:
+            if _propagation is None:
+                graph_store = get_graph_store()
+                if graph_store is not None:
+                    _propagation = TrustPropagation(TRUST_PROPAGATION_PATH, graph_store)
+    return _propagation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Propagate source trust over the TrustGraph run history")
+    parser.add_argument("--db", default=None, help="graph store file (default: TRUSTGRAPH_GRAPH_STORE)")
+    parser.add_argument("--state", default=TRUST_PROPAGATION_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Rebuild all links and propagate from scratch")
+    sub.add_parser("update", help="Fold in runs recorded since the last update")
+    sub.add_parser("lookup", help="Propagated vs domain trust for URLs").add_argument("urls", nargs="+")
+    sub.add_parser("stats", help="Link counts")
+    args = parser.parse_args()
+
+    graph_store = GraphStore(args.db) if args.db else get_graph_store()
+    if graph_store is None:
+        parser.error("the graph store is disabled (TRUSTGRAPH_GRAPH_STORE is empty)")
+    engine = TrustPropagation(args.state, graph_store)
+    if args.command == "build":
+        result: Any = engine.build()
+    elif args.command == "update":
+        result = engine.update()
+    elif args.command == "lookup":
+        propagated = engine.trust_for_keys([canonical_url(url) for url in args.urls])
+        result = [{"url": url, "domain_trust": score_source_url(url),
+                   "propagated_trust": propagated.get(canonical_url(url))} for url in args.urls]
+    else:
+        result = engine.stats()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
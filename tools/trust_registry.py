@@ -0,0 +1,129 @@
+"""TrustGraph source trust registry — domain ratings loaded from a data file.
+
+Ratings are keyed by host suffix ("gov", "nature.com", "bbc.co.uk") with
+optional path-prefix overrides per host. Country second levels rate a
+label directly under any two-letter country TLD, so "gov" there covers
+gov.in, gov.br and gov.uk alike. A URL's host is parsed once and
+matched label by label from most to least specific against a hash index,
+so lookups cost O(number of host labels) regardless of how many domains
+are rated. Resolved hosts are memoized in an LRU cache.
+"""
+
+import json
+import os
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+
+TRUST_REGISTRY_PATH = os.environ.get(
+    "TRUSTGRAPH_TRUST_REGISTRY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "trust_domains.json"),
+)
+
+
+class TrustRegistry:
+    """Suffix-indexed source trust ratings.
+
+    Args:
+        domains: Host suffix -> trust score in [0, 1].
+        paths: Host suffix -> {path prefix -> trust score}. A matching path
+            rule beats the domain rating for the same host suffix.
+        default: Score for hosts with no matching rule.
+        country_second_level: Label -> trust score for "<label>.<cc>"
+            suffixes under any two-letter country TLD. An explicit domain
+            rating for the same suffix wins.
+        cache_size: Number of resolved hosts kept in the LRU cache.
+    """
+
+    def __init__(self, domains: dict[str, float], paths: dict[str, dict[str, float]] | None = None,
+                 default: float = 0.5, country_second_level: dict[str, float] | None = None,
+                 cache_size: int = 65536):
+        self.default = float(default)
+        self.country_second_level = {k.strip().lower(): float(v)
+                                     for k, v in (country_second_level or {}).items()}
+        self.domains = {self._normalize_host(k): float(v) for k, v in domains.items()}
+        self.paths: dict[str, list[tuple[str, float]]] = {}
+        for host, rules in (paths or {}).items():
+            # Longest prefix first so the most specific rule wins
+            self.paths[self._normalize_host(host)] = sorted(
+                ((p, float(s)) for p, s in rules.items()),
+                key=lambda rule: len(rule[0]),
+                reverse=True,
+            )
+        self._resolve_host = lru_cache(maxsize=cache_size)(self._resolve_host_uncached)
+
+    @classmethod
+    def from_file(cls, path: str = TRUST_REGISTRY_PATH, **kwargs) -> "TrustRegistry":
+        """Load a registry from a JSON file with "domains", "paths", "default" and
+        "country_second_level" keys."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data.get("domains", {}),
+            data.get("paths", {}),
+            data.get("default", 0.5),
+            data.get("country_second_level", {}),
+            **kwargs,
+        )
+
+    @staticmethod
+    def _normalize_host(host: str) -> str:
+        host = host.strip().lower().rstrip(".")
+        return host[4:] if host.startswith("www.") else host
+
+    def _resolve_host_uncached(self, host: str) -> tuple[float, tuple]:
+        """Return (domain score, candidate path rules) for a host.
+
+        Walks suffixes from most to least specific. Path rules attached to
+        a more specific suffix than the best domain match are returned as
+        candidates, most specific first.
+        """
+        labels = host.split(".")
+        candidates = []
+        for i in range(len(labels)):
+            suffix = ".".join(labels[i:])
+            if suffix in self.paths:
+                candidates.extend(self.paths[suffix])
+            if suffix in self.domains:
+                return self.domains[suffix], tuple(candidates)
+            if i == len(labels) - 2 and len(labels[-1]) == 2 and labels[i] in self.country_second_level:
+                return self.country_second_level[labels[i]], tuple(candidates)
+        return self.default, tuple(candidates)
+
+    def score(self, url: str) -> float:
+        """Trust score in [0, 1] for a URL."""
+        parts = urlsplit(url if "//" in url else "//" + url)
+        host = self._normalize_host(parts.hostname or "")
+        if not host:
+            return self.default
+        domain_score, path_rules = self._resolve_host(host)
+        if path_rules:
+            path = parts.path or "/"
+            for prefix, rule_score in path_rules:
+                if path.startswith(prefix):
+                    return rule_score
+        return domain_score
+
+    def cache_info(self):
+        """LRU statistics for resolved hosts."""
+        return self._resolve_host.cache_info()
+
+
+_registry: TrustRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_trust_registry() -> TrustRegistry:
+    """Return the shared registry, loading it from TRUST_REGISTRY_PATH on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TrustRegistry.from_file(TRUST_REGISTRY_PATH)
+    return _registry
+
+
+def score_source_url(url: str) -> float:
+    """Trust score for a source URL from the shared registry."""
+    return get_trust_registry().score(url)
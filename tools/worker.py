@@ -0,0 +1,276 @@
+"""TrustGraph warm worker — a long-lived process that serves verification jobs.
+
+Running ``jac run trustgraph.jac`` per query pays for Jac compilation on
+every run, and for the litellm/byllm imports on every run that calls the
+model. The worker loads ``trustgraph.jac`` once, builds the model client
+in the background, and keeps both and its caches warm between jobs.
+
+Start it from the project root:
+
+    python -m tools.worker --port 8765
+
+Protocol: newline-delimited JSON over a local TCP socket. A client sends
+one request line and reads reply lines until the connection closes.
+
+    → {"op": "verify", "query": "...", "options": {"num_claims": 3}}
+    ← {"event": "job_start", "wait_ms": 0.1, "startup_ms": 4210.5, ...}
+    ← {"event": "log", "line": "[1/5] PLAN — ..."}
+    ← {"event": "stage_start", "stage": "plan", ...}      (see tools.events)
+    ← {"event": "job_end", "elapsed_ms": 8123.4}
+
+    → {"op": "status"}
+    ← {"event": "status", "startup_ms": 4210.5, "jobs_served": 12, "busy": false, ...}
+
+Jobs run one at a time; concurrent requests wait their turn. Closing the
+connection cancels the job: a job whose client has gone is skipped when
+its turn comes, and a running job stops at its next stage or fan-out wave
+(see ``tools.concurrency.check_cancelled``).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Iterator
+
+from tools.concurrency import Cancelled, cancel_on
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_HOST = os.environ.get("TRUSTGRAPH_WORKER_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("TRUSTGRAPH_WORKER_PORT", 8765))
+
+
+def load_agent():
+    """Import trustgraph.jac in-process. Returns (module, startup_ms)."""
+    started = time.perf_counter()
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    os.chdir(PROJECT_ROOT)
+    import jaclang  # noqa: F401  (registers the .jac importer)
+    import trustgraph
+    return trustgraph, (time.perf_counter() - started) * 1000
+
+
+class _LineForwarder(io.TextIOBase):
+    """stdout replacement that forwards each printed line to a client socket.
+
+    Lines that are already JSON events (the agent's event stream) are sent
+    as-is; everything else is wrapped as a "log" event. If the client goes
+    away, output is dropped until the job notices it has been cancelled.
+
+    The agent prints from fan-out threads, and ``print`` writes text and
+    newline separately, so partial lines are buffered per thread and whole
+    lines are written to the socket under a lock.
+    """
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self._buffers: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.connected = True
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        ident = threading.get_ident()
+        with self._lock:
+            buffer = self._buffers.pop(ident, "") + text
+            *lines, rest = buffer.split("\n")
+            if rest:
+                self._buffers[ident] = rest
+        for line in lines:
+            self.send_line(line)
+        return len(text)
+
+    def send_line(self, line: str) -> None:
+        if line.startswith('{"event"'):
+            payload = line
+        else:
+            payload = json.dumps({"event": "log", "line": line})
+        self.send_raw(payload)
+
+    def send_raw(self, payload: str) -> None:
+        with self._lock:
+            if not self.connected:
+                return
+            try:
+                self._wfile.write((payload + "\n").encode("utf-8"))
+                self._wfile.flush()
+            except OSError:
+                self.connected = False
+
+    def send(self, event: str, **fields: Any) -> None:
+        self.send_raw(json.dumps({"event": event, **fields}, default=str))
+
+    def flush(self) -> None:
+        """Send the calling thread's partial line."""
+        with self._lock:
+            line = self._buffers.pop(threading.get_ident(), "")
+        if line:
+            self.send_line(line)
+
+    def drain(self) -> None:
+        """Send every thread's partial line; called once the job is over."""
+        with self._lock:
+            lines, self._buffers = list(self._buffers.values()), {}
+        for line in lines:
+            self.send_line(line)
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], agent_module, startup_ms: float):
+        super().__init__(address, _JobHandler)
+        self.agent = agent_module
+        self.startup_ms = startup_ms
+        self.started_at = time.time()
+        self.jobs_served = 0
+        self.job_lock = threading.Lock()
+
+    def status(self) -> dict:
+        return {
+            "startup_ms": round(self.startup_ms, 1),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "jobs_served": self.jobs_served,
+            "busy": self.job_lock.locked(),
+        }
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    server: WorkerServer
+
+    def handle(self) -> None:
+        out = _LineForwarder(self.wfile)
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8") or "{}")
+        except ValueError:
+            out.send("error", error="malformed request")
+            return
+
+        op = request.get("op")
+        if op == "status":
+            out.send("status", **self.server.status())
+        elif op == "verify":
+            self._verify(request, out)
+        else:
+            out.send("error", error=f"unknown op: {op!r}")
+
+    def _watch_client(self, cancelled: threading.Event) -> None:
+        """Set ``cancelled`` once the client closes its end of the connection."""
+        try:
+            while self.connection.recv(1024):
+                pass
+        except OSError:
+            pass
+        cancelled.set()
+
+    def _verify(self, request: dict, out: _LineForwarder) -> None:
+        cancelled = threading.Event()
+        threading.Thread(target=self._watch_client, args=(cancelled,),
+                         name="client-watch", daemon=True).start()
+        try:
+            self._run_job(request, out, cancelled)
+        finally:
+            # Wake the watcher; the client has its reply either way
+            with contextlib.suppress(OSError):
+                self.connection.shutdown(socket.SHUT_RD)
+
+    def _run_job(self, request: dict, out: _LineForwarder, cancelled: threading.Event) -> None:
+        queued = time.perf_counter()
+        with self.server.job_lock:
+            if cancelled.is_set():
+                return
+            started = time.perf_counter()
+            out.send("job_start",
+                     wait_ms=round((started - queued) * 1000, 1),
+                     startup_ms=round(self.server.startup_ms, 1),
+                     jobs_served=self.server.jobs_served)
+            try:
+                # The agent's event stream goes to stdout, which is forwarded
+                with contextlib.redirect_stdout(out), cancel_on(cancelled):
+                    self.server.agent.run_verification(
+                        request.get("query", ""), request.get("options", {})
+                    )
+            except Cancelled:
+                out.send("job_cancelled")
+            except Exception as e:
+                out.send("job_error", error=f"{type(e).__name__}: {e}")
+            finally:
+                out.drain()
+                self.server.jobs_served += 1
+            out.send("job_end", elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+def connect(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+            timeout: float = 0.5) -> socket.socket | None:
+    """Open a connection to a running worker, or return None if none is listening."""
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError:
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def status(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> dict | None:
+    """The running worker's status event, or None if no worker is listening."""
+    sock = connect(host, port)
+    if sock is None:
+        return None
+    try:
+        for event in request(sock, {"op": "status"}):
+            if event.get("event") == "status":
+                return event
+    except OSError:
+        pass
+    return None
+
+
+def request(sock: socket.socket, payload: dict) -> Iterator[dict]:
+    """Send one request on ``sock`` and yield reply events until the worker closes it."""
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(payload) + "\n").encode("utf-8"))
+        stream.flush()
+        for raw in stream:
+            line = raw.decode("utf-8").strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {"event": "log", "line": line}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TrustGraph warm verification worker")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    # Route the agent's NDJSON events to (forwarded) stdout
+    os.environ["TRUSTGRAPH_EVENTS"] = "-"
+    agent, startup_ms = load_agent()
+    # The agent builds its byLLM model on first use; build it while the worker waits for jobs
+    threading.Thread(target=agent.llm.model, name="llm-warmup", daemon=True).start()
+    server = WorkerServer((args.host, args.port), agent, startup_ms)
+    print(f"TrustGraph worker listening on {args.host}:{args.port} "
+          f"(cold start {startup_ms / 1000:.2f}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,8 @@
 """TrustGraph — Interactive Web UI for Agentic Knowledge Verification."""
 
 import streamlit as st
-import subprocess
-import json
 import os
+import sys
 import time
 
 st.set_page_config(
@@ -129,34 +128,217 @@ def verdict_emoji(verdict):
 
 # Project root is one level up from ui/
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+import math
+from itertools import islice
+
+from tools.jobs import FINISHED, JobManager
+from tools.report_archive import VERDICTS, claim_verdict, get_report_archive, iter_claim_rows, summarize_report
+
+CLAIMS_PER_PAGE = 20
+SOURCES_PER_CLAIM = 8
+HISTORY_PER_PAGE = 10
+
+
+@st.cache_resource
+def get_job_manager():
+    """One job manager shared by every browser session of this Streamlit server."""
+    return JobManager()
+
+
+@st.cache_resource
+def get_archive():
+    """The report archive shared by every session (None if TRUSTGRAPH_REPORT_ARCHIVE is empty)."""
+    return get_report_archive()
+
+
+# Archived reports never change, so summaries and claim pages are cached by id.
+# The history list is keyed by the archive's version and refreshes when a run lands.
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_history(version, search, page):
+    archive = get_archive()
+    return archive.count(search), archive.recent(page * HISTORY_PER_PAGE, HISTORY_PER_PAGE, search)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_summary(report_id):
+    return get_archive().summary(report_id)
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def load_claim_page(report_id, verdict, page):
+    return get_archive().claims(report_id, page * CLAIMS_PER_PAGE, CLAIMS_PER_PAGE, verdict)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_full_report(report_id):
+    return get_archive().report(report_id)
 
-def run_agent(query, num_claims=0):
-    """Run the TrustGraph Jac agent as a subprocess."""
-    env = os.environ.copy()
-    env["PYTHONUNBUFFERED"] = "1"
-    cmd = ["jac", "run", "trustgraph.jac"]
-
-    # Write the query and config
-    with open(os.path.join(PROJECT_ROOT, "_query.txt"), "w", encoding="utf-8") as f:
-        f.write(query)
-    with open(os.path.join(PROJECT_ROOT, "_config.json"), "w", encoding="utf-8") as f:
-        json.dump({"num_claims": num_claims}, f)
-
-    process = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        cwd=PROJECT_ROOT,
-        env=env,
-    )
 
-    lines = []
-    for line in process.stdout:
-        lines.append(line.rstrip())
-        yield line.rstrip()
+def render_claim(claim, i, expanded=False, key=None):
+    """Render one JSON-LD claim as an expander with its opinion and sources."""
+    conf = claim.get("ex:confidence", {})
+    prob = conf.get("ex:projectedProbability", 0)
+    belief = conf.get("ex:belief", 0)
+    disbelief = conf.get("ex:disbelief", 0)
+    uncertainty = conf.get("ex:uncertainty", 0)
 
-    process.wait()
+    verdict = claim_verdict(prob)
+    emoji = verdict_emoji(verdict)
+    claim_text = claim.get("ex:claimText", "Unknown claim")
+
+    with st.expander(f"{emoji} Claim {i+1}: {claim_text[:80]}... — **P={prob:.3f}** ({verdict})", expanded=expanded):
+        st.markdown(f"**Full Claim:** {claim_text}")
+        st.markdown(render_opinion_bar(belief, disbelief, uncertainty), unsafe_allow_html=True)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.metric("Projected Probability", f"{prob:.3f}")
+        with c2:
+            st.metric("Verdict", verdict.upper())
+
+        # Sources
+        sources = claim.get("ex:sources", [])
+        if sources:
+            st.markdown("**Sources:**")
+            shown = sources
+            if len(sources) > SOURCES_PER_CLAIM:
+                if key is None or not st.checkbox(f"Show all {len(sources)} sources", key=f"{key}_sources"):
+                    shown = sources[:SOURCES_PER_CLAIM]
+            for s in shown:
+                title = s.get("title", "Unknown")
+                url = s.get("url", "")
+                trust = s.get("trust_score", 0)
+                supports = s.get("supports", True)
+                icon = "✅" if supports else "❌"
+                label = "supports" if supports else "contradicts"
+                if url:
+                    st.markdown(
+                        f'<span class="source-chip">{icon} <a href="{url}">{title}</a> '
+                        f'(trust: {trust:.2f}, {label})</span>',
+                        unsafe_allow_html=True
+                    )
+            if len(shown) < len(sources):
+                st.caption(f"… and {len(sources) - len(shown)} more")
+
+
+def render_report(summary, load_page, load_full, key):
+    """Render a report from its summary, fetching claim pages and the full JSON-LD only on demand.
+
+    ``load_page(verdict, page)`` returns ``ReportArchive.claims`` items and
+    ``load_full()`` the complete JSON-LD report.
+    """
+    st.markdown("### 📋 Verification Report")
+    if summary.get("query"):
+        st.caption(f"Query: {summary['query']}")
+
+    # Metrics row
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        st.markdown(f"""<div class="metric-box">
+            <div class="metric-value">{summary["num_claims"]}</div>
+            <div class="metric-label">Claims Verified</div>
+        </div>""", unsafe_allow_html=True)
+    with m2:
+        st.markdown(f"""<div class="metric-box">
+            <div class="metric-value" style="color:#00c853">{summary["supported"]}</div>
+            <div class="metric-label">Supported</div>
+        </div>""", unsafe_allow_html=True)
+    with m3:
+        st.markdown(f"""<div class="metric-box">
+            <div class="metric-value" style="color:#ff9100">{summary["contested"]}</div>
+            <div class="metric-label">Contested</div>
+        </div>""", unsafe_allow_html=True)
+    with m4:
+        st.markdown(f"""<div class="metric-box">
+            <div class="metric-value" style="color:#ff1744">{summary["num_conflicts"]}</div>
+            <div class="metric-label">Conflicts</div>
+        </div>""", unsafe_allow_html=True)
+
+    st.markdown("")
+
+    # Summary
+    if summary.get("summary"):
+        st.info(f"**Executive Summary:** {summary['summary']}")
+
+    st.markdown("")
+
+    # ── Claims Detail ──
+    st.markdown("### 🎯 Claims Analysis")
+
+    verdict = st.radio("Show", ("all",) + VERDICTS, horizontal=True, key=f"{key}_verdict",
+                       format_func=lambda v: "All" if v == "all" else f"{verdict_emoji(v)} {v.title()}")
+    total = summary["num_claims"] if verdict == "all" else summary[verdict]
+    pages = max(1, math.ceil(total / CLAIMS_PER_PAGE))
+    page = 0
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                               key=f"{key}_page_{verdict}") - 1
+    for row in load_page(None if verdict == "all" else verdict, page):
+        render_claim(row["claim"], row["position"], expanded=(row["position"] == 0), key=f"{key}_{row['position']}")
+    if pages > 1:
+        start = page * CLAIMS_PER_PAGE
+        st.caption(f"Claims {start + 1}–{min(start + CLAIMS_PER_PAGE, total)} of {total}")
+
+    # ── Conflicts ──
+    conflicts = summary.get("conflicts", [])
+    if conflicts:
+        st.markdown("### ⚡ Evidence Conflicts")
+        for conf in conflicts:
+            claim_text = conf.get("claim", "")
+            degree = conf.get("conflict_degree", 0)
+            n_sup = conf.get("num_supporting", 0)
+            n_con = conf.get("num_contradicting", 0)
+            st.warning(
+                f"**Conflict (degree: {degree:.3f})** in: \"{claim_text}\"\n\n"
+                f"{n_sup} source(s) support vs {n_con} source(s) contradict"
+            )
+
+    # ── JSON-LD Output ──
+    st.markdown("### 📦 JSON-LD Output (Machine-Readable)")
+    with st.expander("View JSON-LD (interoperable with SPARQL, RDF, PROV-O)"):
+        if st.checkbox("Load full report", key=f"{key}_jsonld"):
+            st.json(load_full())
+
+
+def render_archived_report(report_id):
+    summary = load_summary(report_id)
+    if summary is None:
+        st.warning(f"Report {report_id} is no longer in the archive.")
+        return
+    render_report(summary, lambda verdict, page: load_claim_page(report_id, verdict, page),
+                  lambda: load_full_report(report_id), key=f"report_{report_id}")
+
+
+def render_live_report(report):
+    """Render a report that was not archived (archive disabled) straight from memory."""
+    def load_page(verdict, page):
+        start = page * CLAIMS_PER_PAGE
+        return list(islice(iter_claim_rows(report, verdict), start, start + CLAIMS_PER_PAGE))
+    render_report(summarize_report(report), load_page, lambda: report, key="report_live")
+
+
+# ── Report History ──
+archive = get_archive()
+if archive is not None:
+    with st.sidebar:
+        st.markdown("### 📚 Report History")
+        search = st.text_input("Search past queries", key="history_search")
+        history_page = st.session_state.get(f"history_page_{search}", 1) - 1
+        total, rows = load_history(archive.version(), search, history_page)
+        if not rows:
+            st.caption("No archived reports yet." if not search else "No matching reports.")
+        for row in rows:
+            st.button(row["query"][:70] or "(no query)", key=f"history_{row['id']}", use_container_width=True,
+                      on_click=lambda rid=row["id"]: st.session_state.update(view_report=rid))
+            st.caption(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created_at']))} · "
+                       f"✅ {row['supported']} ⚠️ {row['contested']} ❌ {row['refuted']}")
+        history_pages = max(1, math.ceil(total / HISTORY_PER_PAGE))
+        if history_pages > 1:
+            st.number_input(f"Page (of {history_pages})", min_value=1, max_value=history_pages,
+                            key=f"history_page_{search}")
 
 
 # ── Input ──
@@ -197,152 +379,108 @@ if "selected_example" in st.session_state:
 st.divider()
 
 # ── Run Agent ──
+manager = get_job_manager()
+
+# A click on "Cancel" reruns the script; cancel the job this session started.
+# Other reruns keep the handle until the job finishes
+active_job = st.session_state.get("active_job")
+if active_job and st.session_state.pop("cancel_clicked", False):
+    manager.cancel(active_job)
+    st.session_state.pop("active_job", None)
+    st.warning("Verification cancelled.")
+elif active_job and (manager.get(active_job) is None or manager.get(active_job).status in FINISHED):
+    st.session_state.pop("active_job", None)
+elif active_job and not run_clicked:
+    st.info(f"Verification job `{active_job}` is still running.")
+    st.button("✖ Cancel", key="cancel_job",
+              on_click=lambda: st.session_state.update(cancel_clicked=True))
+
 if run_clicked and query:
+    job = manager.submit(query, {"num_claims": num_claims})
+    st.session_state["active_job"] = job.job_id
+
     # Progress section
     progress_container = st.container()
     with progress_container:
         st.markdown("### 🔄 Agent Running...")
-        log_area = st.empty()
+        st.button("✖ Cancel", key="cancel_job",
+                  on_click=lambda: st.session_state.update(cancel_clicked=True))
+        queue_area = st.empty()
         progress_bar = st.progress(0)
+        stage_area = st.empty()
+        log_area = st.empty()
+        live_claims = st.container()
 
     log_lines = []
-    step_map = {
-        "[1/5]": 0.15,
-        "[2/5]": 0.35,
-        "[3/5]": 0.55,
-        "[4/5]": 0.75,
-        "[5/5]": 0.90,
+    stage_progress = {
+        "plan": (0.05, 0.15),
+        "search": (0.15, 0.35),
+        "extract": (0.35, 0.65),
+        "score": (0.65, 0.85),
+        "report": (0.85, 0.95),
     }
-
-    for line in run_agent(query, num_claims):
-        log_lines.append(line)
-        # Update progress based on step markers
-        for marker, pct in step_map.items():
-            if marker in line:
-                progress_bar.progress(pct)
-        # Show last 15 lines of log
-        display_lines = log_lines[-15:]
-        log_area.code("\n".join(display_lines), language="text")
-
+    stage_times = []
+    report = None
+    archive_id = None
+
+    for kind, item in manager.stream(job):
+        if kind == "log":
+            log_lines.append(item)
+            # Show last 15 lines of log
+            log_area.code("\n".join(log_lines[-15:]), language="text")
+            continue
+
+        event = item.get("event")
+        if event == "stage_start" and item.get("stage") in stage_progress:
+            progress_bar.progress(stage_progress[item["stage"]][0])
+            stage_area.caption(f"Stage: **{item['stage']}**")
+        elif event == "stage_end" and item.get("stage") in stage_progress:
+            progress_bar.progress(stage_progress[item["stage"]][1])
+            if item.get("elapsed_ms") is not None:
+                stage_times.append(f"{item['stage']} {item['elapsed_ms'] / 1000:.1f}s")
+                stage_area.caption(" → ".join(stage_times))
+        elif event == "claim" and item.get("claim"):
+            # Render each claim as soon as it is scored
+            with live_claims:
+                render_claim(item["claim"], item.get("index", 0))
+        elif event == "startup":
+            label = "warm worker" if item["mode"] == "worker" else "cold start: jac run subprocess"
+            stage_times.append(f"startup {item['overhead_ms'] / 1000:.1f}s ({label})")
+            stage_area.caption(" → ".join(stage_times))
+        elif event == "job_queued":
+            m = manager.metrics()
+            queue_area.caption(f"Queued at position {item['position']} — "
+                               f"{m['running']}/{m['max_concurrent']} jobs running")
+        elif event == "job_start":
+            queue_area.caption(f"Job `{job.job_id}` started after {item['wait_ms'] / 1000:.1f}s in queue")
+        elif event == "job_error":
+            log_lines.append(f"[ERROR] {item.get('error')}")
+            log_area.code("\n".join(log_lines[-15:]), language="text")
+        elif event == "run_end":
+            report = item.get("report")
+            archive_id = item.get("archive_id")
+
+    st.session_state.pop("active_job", None)
     progress_bar.progress(1.0)
     time.sleep(0.5)
 
     # ── Load Results ──
-    output_path = os.path.join(PROJECT_ROOT, "output.json")
-    if os.path.exists(output_path):
-        with open(output_path, "r") as f:
-            report = json.load(f)
-
+    if report is None:
+        report = job.report
+    if report is None and job.error:
+        st.error(f"Verification {job.status}: {job.error}")
+    if report is not None:
         # Clear progress
         progress_container.empty()
 
-        # ── Summary Section ──
-        st.markdown("### 📋 Verification Report")
-
-        # Metrics row
-        claims = report.get("ex:claims", [])
-        conflicts = report.get("ex:conflicts", [])
-
-        supported = sum(1 for c in claims if c.get("ex:confidence", {}).get("ex:projectedProbability", 0) >= 0.7)
-        contested = sum(1 for c in claims if 0.3 < c.get("ex:confidence", {}).get("ex:projectedProbability", 0) < 0.7)
-        refuted = sum(1 for c in claims if c.get("ex:confidence", {}).get("ex:projectedProbability", 0) <= 0.3)
-
-        m1, m2, m3, m4 = st.columns(4)
-        with m1:
-            st.markdown(f"""<div class="metric-box">
-                <div class="metric-value">{len(claims)}</div>
-                <div class="metric-label">Claims Verified</div>
-            </div>""", unsafe_allow_html=True)
-        with m2:
-            st.markdown(f"""<div class="metric-box">
-                <div class="metric-value" style="color:#00c853">{supported}</div>
-                <div class="metric-label">Supported</div>
-            </div>""", unsafe_allow_html=True)
-        with m3:
-            st.markdown(f"""<div class="metric-box">
-                <div class="metric-value" style="color:#ff9100">{contested}</div>
-                <div class="metric-label">Contested</div>
-            </div>""", unsafe_allow_html=True)
-        with m4:
-            st.markdown(f"""<div class="metric-box">
-                <div class="metric-value" style="color:#ff1744">{len(conflicts)}</div>
-                <div class="metric-label">Conflicts</div>
-            </div>""", unsafe_allow_html=True)
-
-        st.markdown("")
-
-        # Summary
-        summary = report.get("ex:summary", "")
-        if summary:
-            st.info(f"**Executive Summary:** {summary}")
-
-        st.markdown("")
-
-        # ── Claims Detail ──
-        st.markdown("### 🎯 Claims Analysis")
-
-        for i, claim in enumerate(claims):
-            conf = claim.get("ex:confidence", {})
-            prob = conf.get("ex:projectedProbability", 0)
-            belief = conf.get("ex:belief", 0)
-            disbelief = conf.get("ex:disbelief", 0)
-            uncertainty = conf.get("ex:uncertainty", 0)
-
-            if prob >= 0.7:
-                verdict = "supported"
-            elif prob > 0.3:
-                verdict = "contested"
-            else:
-                verdict = "refuted"
-
-            emoji = verdict_emoji(verdict)
-            claim_text = claim.get("ex:claimText", "Unknown claim")
-
-            with st.expander(f"{emoji} Claim {i+1}: {claim_text[:80]}... — **P={prob:.3f}** ({verdict})", expanded=(i == 0)):
-                st.markdown(f"**Full Claim:** {claim_text}")
-                st.markdown(render_opinion_bar(belief, disbelief, uncertainty), unsafe_allow_html=True)
-
-                c1, c2 = st.columns(2)
-                with c1:
-                    st.metric("Projected Probability", f"{prob:.3f}")
-                with c2:
-                    st.metric("Verdict", verdict.upper())
-
-                # Sources
-                sources = claim.get("ex:sources", [])
-                if sources:
-                    st.markdown("**Sources:**")
-                    for s in sources:
-                        title = s.get("title", "Unknown")
-                        url = s.get("url", "")
-                        trust = s.get("trust_score", 0)
-                        supports = s.get("supports", True)
-                        icon = "✅" if supports else "❌"
-                        label = "supports" if supports else "contradicts"
-                        if url:
-                            st.markdown(
-                                f'<span class="source-chip">{icon} <a href="{url}">{title}</a> '
-                                f'(trust: {trust:.2f}, {label})</span>',
-                                unsafe_allow_html=True
-                            )
-
-        # ── Conflicts ──
-        if conflicts:
-            st.markdown("### ⚡ Evidence Conflicts")
-            for conf in conflicts:
-                claim_text = conf.get("claim", "")
-                degree = conf.get("conflict_degree", 0)
-                n_sup = conf.get("num_supporting", 0)
-                n_con = conf.get("num_contradicting", 0)
-                st.warning(
-                    f"**Conflict (degree: {degree:.3f})** in: \"{claim_text}\"\n\n"
-                    f"{n_sup} source(s) support vs {n_con} source(s) contradict"
-                )
-
-        # ── JSON-LD Output ──
-        st.markdown("### 📦 JSON-LD Output (Machine-Readable)")
-        with st.expander("View JSON-LD (interoperable with SPARQL, RDF, PROV-O)"):
-            st.json(report)
+        # Later reruns (paging, filters) show this report from the archive or session
+        if archive_id is not None and archive is not None:
+            st.session_state["view_report"] = archive_id
+            render_archived_report(archive_id)
+        else:
+            st.session_state["view_report"] = None
+            st.session_state["last_report"] = report
+            render_live_report(report)
 
         # ── Agent Log ──
         with st.expander("📜 Agent Execution Log"):
@@ -354,6 +492,12 @@ if run_clicked and query:
 elif not query and run_clicked:
     st.warning("Please enter a research question.")
 
+elif st.session_state.get("view_report") is not None and archive is not None:
+    render_archived_report(st.session_state["view_report"])
+
+elif st.session_state.get("last_report") is not None:
+    render_live_report(st.session_state["last_report"])
+
 # ── Footer ──
 st.divider()
 st.markdown("""